@@ -4,7 +4,8 @@ import hashlib
 import json
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -12,8 +13,9 @@ from app.config import get_settings
 from app.database import get_db
 from app.services.bam_offers import DEFAULT_PROPERTY, PROPERTIES
 from app.services.internal_links import get_links_store
+from app.services.io_utils import write_jsonl
 from app.services.rag_builder import build_rag_index
-from app.services.usage_tracking import list_usage_events, usage_events_csv, usage_summary
+from app.services.usage_tracking import iter_usage_events_csv, list_usage_events, usage_summary
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 settings = get_settings()
@@ -100,9 +102,7 @@ def _read_source_records(source: Path) -> list[dict]:
 
 
 def _write_source_records(source: Path, records: list[dict]) -> None:
-    with open(source, "w", encoding="utf-8") as f:
-        for rec in records:
-            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    write_jsonl(source, records)
 
 
 @router.get("/status")
@@ -320,14 +320,13 @@ async def export_usage_events(
     db: AsyncSession = Depends(get_db),  # noqa: ARG001
 ):
     """Export persisted usage events as CSV."""
-    csv_text = await usage_events_csv(
-        days=days,
-        limit=limit,
-        username=username,
-        event_type=event_type,
-    )
-    return Response(
-        content=csv_text,
+    return StreamingResponse(
+        iter_usage_events_csv(
+            days=days,
+            limit=limit,
+            username=username,
+            event_type=event_type,
+        ),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=usage-events.csv"},
     )
@@ -14,6 +14,7 @@ from app.database import get_db
 from app.schemas.outline import OutlineRequest, DraftRequest
 from app.services.outline import (
     generate_structured_outline,
+    generate_structured_outline_streaming,
     outline_to_text,
     parse_outline_tokens,
     structured_to_tokens,
@@ -272,7 +273,9 @@ async def _stream_outline(request: OutlineRequest, db: AsyncSession) -> AsyncGen
 
     try:
         yield f"data: {json.dumps({'type': 'status', 'message': 'Generating structured outline...'})}\n\n"
-        outline_structured = await generate_structured_outline(
+        outline_structured: list[dict] = []
+        sections_seen = 0
+        async for update in generate_structured_outline_streaming(
             keyword=request.keyword,
             title=request.title,
             offer=offer or {},
@@ -281,7 +284,15 @@ async def _stream_outline(request: OutlineRequest, db: AsyncSession) -> AsyncGen
             bet_example=bet_example_str,
             competitor_context=competitor_context,
             article_preferences=prefs,
-        )
+        ):
+            if update["type"] == "section":
+                # Sections are provisional until "done"; report progress only
+                # and send the content once, as final tokens
+                sections_seen += 1
+                yield f"data: {json.dumps({'type': 'status', 'message': f'Outlined {sections_seen} sections...'})}\n\n"
+            elif update["type"] == "done":
+                outline_structured = update["outline"]
+
         tokens = structured_to_tokens(outline_structured)
         outline_text = outline_to_text(outline_structured)
 
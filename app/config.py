@@ -35,6 +35,11 @@ class Settings(BaseSettings):
     embed_model: str = "text-embedding-3-small"
     llm_model: str = "gpt-5.5-2026-04-23"
 
+    # Outline semantic cache (reuse outlines for near-duplicate keywords).
+    # Off by default: every exact-cache miss then pays an embeddings call.
+    outline_semantic_cache_enabled: bool = False
+    outline_semantic_cache_threshold: float = 0.92
+
     # Offers (BAM)
     offers_property: str = "action_network"
 
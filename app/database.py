@@ -56,6 +56,12 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+def _create_missing_indexes(sync_conn) -> None:
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+
 async def init_db() -> None:
     """Initialize database tables."""
     # Ensure all model modules are imported before create_all.
@@ -64,6 +70,10 @@ async def init_db() -> None:
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
+        # create_all skips indexes on tables that already exist; add any new
+        # ones (no Alembic here).
+        await conn.run_sync(_create_missing_indexes)
+
         # Lightweight column backfill for existing SQLite DBs (no Alembic here).
         if _normalize_database_url(settings.database_url).startswith("sqlite"):
             try:
@@ -3,6 +3,7 @@
 import secrets
 import time
 import logging
+import orjson
 import structlog
 from contextlib import asynccontextmanager
 from urllib.parse import quote
@@ -16,7 +17,7 @@ from fastapi.templating import Jinja2Templates
 
 from app.config import get_settings
 from app.database import init_db
-from app.services.usage_tracking import record_usage_event
+from app.services.usage_tracking import drain_usage_events, record_usage_event
 
 # Ensure structlog has a sink in container/runtime logs.
 logging.basicConfig(level=logging.INFO, format="%(message)s")
@@ -59,15 +60,24 @@ async def lifespan(app: FastAPI):
     yield
 
     # Shutdown
+    await drain_usage_events()
     logger.info("Shutting down PlanWrite v2")
 
 
+class _OrjsonResponse(JSONResponse):
+    """JSON responses rendered by orjson instead of the stdlib encoder."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
 # Create FastAPI app
 app = FastAPI(
     title="TopStoriesGenerator",
     description="Better Collective internal content tool",
     version="2.0.0",
     lifespan=lifespan,
+    default_response_class=_OrjsonResponse,
 )
 
 
@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, Float, Integer, String, Text, func
+from sqlalchemy import DateTime, Float, Index, Integer, String, Text, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
@@ -13,6 +13,18 @@ class UsageEvent(Base):
     """Audit row for usage tracking."""
 
     __tablename__ = "usage_events"
+    # Composite indexes for usage_summary's windowed GROUP BY queries.
+    __table_args__ = (
+        Index("ix_usage_created_event", "created_at", "event_type"),
+        Index("ix_usage_created_user", "created_at", "username"),
+        Index(
+            "ix_usage_apipath",
+            "created_at",
+            "path",
+            sqlite_where=text("event_type = 'api_request' AND path IS NOT NULL"),
+            postgresql_where=text("event_type = 'api_request' AND path IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False, index=True)
@@ -7,14 +7,13 @@ Outputs HTML format for direct publishing.
 import hashlib
 import re
 import markdown
-from datetime import datetime
 from html import escape
 from typing import AsyncGenerator, Any
 from uuid import uuid4
-from zoneinfo import ZoneInfo
 
 from app.services.llm import generate_completion, generate_completion_structured
 from app.services.rag import query_articles
+from app.services.text_utils import today_long
 from app.services.internal_links import (
     format_links_markdown,
     get_links_by_urls,
@@ -50,15 +49,6 @@ TOP_STORY_TRACKING_TAG = """<script>
 </script>"""
 
 
-def today_long(tz: str = "US/Eastern") -> str:
-    """Get today's date in long format."""
-    try:
-        now = datetime.now(ZoneInfo(tz))
-    except Exception:
-        now = datetime.now()
-    return f"{now.strftime('%A')}, {now.strftime('%B')} {now.day}, {now.year}"
-
-
 def md_to_html(md_text: str) -> str:
     """Convert markdown to HTML."""
     return markdown.markdown(
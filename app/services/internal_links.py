@@ -46,6 +46,10 @@ OPERATOR_PATTERNS: list[tuple[re.Pattern[str], str]] = [
     (re.compile(r"\bdabble\b", re.IGNORECASE), "dabble"),
     (re.compile(r"\bprophetx\b|\bprophet\b", re.IGNORECASE), "prophetx"),
 ]
+# Literal every match of the operator's pattern contains (default: the
+# operator key). Checking it with `in` first skips most regex searches.
+_OPERATOR_NEEDLES = {"thescore": "score", "hard_rock": "rock", "prophetx": "prophet"}
+_OPERATOR_SCAN = [(_OPERATOR_NEEDLES.get(value, value), pattern, value) for pattern, value in OPERATOR_PATTERNS]
 
 # Property-level evergreen links that must be available every generation.
 REQUIRED_LINKS_BY_PROPERTY: dict[str, list[dict[str, object]]] = {
@@ -182,8 +186,8 @@ def _normalize_operator(text: str) -> str:
     clean = (text or "").strip().lower()
     if not clean:
         return ""
-    for pattern, value in OPERATOR_PATTERNS:
-        if pattern.search(clean):
+    for needle, pattern, value in _OPERATOR_SCAN:
+        if needle in clean and pattern.search(clean):
             return value
     return ""
 
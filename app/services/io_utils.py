@@ -0,0 +1,12 @@
+"""Small file I/O helpers shared across services, API routes and scripts."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import orjson
+
+
+def write_jsonl(path: Path, records: list[dict]) -> None:
+    """Write ``records`` as JSON lines in one buffered write."""
+    path.write_bytes(b"".join(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE) for record in records))
@@ -51,6 +51,45 @@ def _sampling_params(model: str, temperature: float) -> dict:
     return {"temperature": temperature}
 
 
+_JSON_CLOSERS = {"{": "}", "[": "]"}
+
+
+def _extract_json_block(text: str) -> str | None:
+    """Return the first balanced JSON object/array in ``text``.
+
+    Single linear pass that tracks bracket depth and skips string literals,
+    so trailing prose or markdown fences around the JSON are ignored.
+    """
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        return None
+    start = min(starts)
+
+    stack: list[str] = []
+    in_str = False
+    esc = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_str:
+            if esc:
+                esc = False
+            elif ch == "\\":
+                esc = True
+            elif ch == '"':
+                in_str = False
+            continue
+        if ch == '"':
+            in_str = True
+        elif ch in _JSON_CLOSERS:
+            stack.append(_JSON_CLOSERS[ch])
+        elif ch in ("}", "]"):
+            if not stack or stack.pop() != ch:
+                return None
+            if not stack:
+                return text[start:i + 1]
+    return None
+
+
 async def _with_openai_retries(op_name: str, fn: Callable[[], Any]) -> Any:
     """Run an OpenAI request with simple retry/backoff."""
     last_exc: Exception | None = None
@@ -143,6 +182,12 @@ async def generate_completion_structured(
     try:
         return json.loads(content)
     except json.JSONDecodeError:
+        block = _extract_json_block(content)
+        if block is not None:
+            try:
+                return json.loads(block)
+            except json.JSONDecodeError:
+                pass
         logger.warning("Structured output JSON parse failed", content=content[:500])
         raise
 
@@ -153,9 +198,15 @@ async def generate_completion_streaming(
     model: str | None = None,
     temperature: float = 0.3,
     max_tokens: int = 4096,
+    response_format: dict | None = None,
 ) -> AsyncGenerator[str, None]:
-    """Generate a completion with streaming response."""
+    """Generate a completion with streaming response.
+
+    Pass ``response_format`` (e.g. a json_schema format) to constrain the
+    streamed output the same way generate_completion_structured does.
+    """
     model = model or settings.llm_model
+    extra = {"response_format": response_format} if response_format else {}
 
     async def _call_stream():
         return await client.chat.completions.create(
@@ -166,6 +217,7 @@ async def generate_completion_streaming(
             ],
             **_sampling_params(model, temperature),
             **_token_param(model, max_tokens),
+            **extra,
             stream=True,
         )
 
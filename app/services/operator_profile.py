@@ -18,6 +18,10 @@ _OPERATOR_PATTERNS: list[tuple[re.Pattern[str], str]] = [
     (re.compile(r"\bnovig\b", re.IGNORECASE), "novig"),
     (re.compile(r"\bsleeper\b", re.IGNORECASE), "sleeper"),
 ]
+# Every pattern above only matches text containing its operator name, so a
+# C-level substring check on the lowercased text rules most patterns out
+# before any regex runs.
+_OPERATOR_SCAN = [(operator, pattern, operator) for pattern, operator in _OPERATOR_PATTERNS]
 
 CONTENT_MODE_SPORTSBOOK = "sportsbook"
 CONTENT_MODE_PREDICTION_MARKET = "prediction_market"
@@ -33,8 +37,9 @@ def normalize_operator(*values: Any) -> str:
     text = " ".join(str(v) for v in values if v).strip()
     if not text:
         return ""
-    for pattern, operator in _OPERATOR_PATTERNS:
-        if pattern.search(text):
+    lowered = text.lower()
+    for needle, pattern, operator in _OPERATOR_SCAN:
+        if needle in lowered and pattern.search(text):
             return operator
     return ""
 
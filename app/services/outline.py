@@ -7,17 +7,24 @@ Writers can review and modify the outline before draft generation (Execute stage
 import hashlib
 import json
 import re
-from datetime import datetime
+import time
+from functools import lru_cache
 from typing import Any, AsyncGenerator
 from uuid import uuid4
-from zoneinfo import ZoneInfo
+
+try:  # Optional: pip install -e ".[fast]" for the RE2 line-matching backend
+    import re2 as _fastre
+except ImportError:  # pragma: no cover - stdlib fallback
+    _fastre = re
 
 from app.services.llm import (
     generate_completion,
     generate_completion_streaming,
     generate_completion_structured,
 )
+from app.services.outline_cache import outline_cache, outline_cache_key, semantic_outline_cache
 from app.services.rag import query_articles
+from app.services.text_utils import today_long
 from app.services.content_guidelines import get_style_instructions, get_temperature_by_section
 from app.services.operator_profile import (
     CONTENT_MODE_DFS,
@@ -26,6 +33,45 @@ from app.services.operator_profile import (
 )
 
 
+# Outline line patterns (hot path: every streamed line / edited outline line).
+# Inline (?i) keeps them portable across the re and re2 backends.
+_INTRO_LINE_RE = _fastre.compile(r"(?i)^\[INTRO\]$")
+_SHORTCODE_LINE_RE = _fastre.compile(r"(?i)^\[(SHORTCODE(?:_[A-Z0-9]+)?)\]$")
+_H2_LINE_RE = _fastre.compile(r"(?i)^\[H2:\s*(.+)\]$")
+_H3_LINE_RE = _fastre.compile(r"(?i)^\[H3:\s*(.+)\]$")
+_AVOID_LINE_RE = _fastre.compile(r"(?i)^!\s*Avoid:\s*(.+)$")
+
+# Shared bracket-token filter for the streaming checks. The uppercased
+# 4-char prefix set rejects chatter lines before the full regex runs.
+_TOKEN_LINE_RE = _fastre.compile(r"(?i)^\[(?:INTRO|SHORTCODE(?:_[A-Z0-9]+)?|H[23]:\s*.+)\]$")
+_TOKEN_LINE_PREFIXES = frozenset({"[INT", "[SHO", "[H2:", "[H3:"})
+
+
+def _is_token_line(line: str) -> bool:
+    """True when a stripped line is a bracket outline token."""
+    return line[:4].upper() in _TOKEN_LINE_PREFIXES and _TOKEN_LINE_RE.match(line) is not None
+
+
+# Multi-line form of _TOKEN_LINE_RE for scanning a block of streamed lines.
+# [^\S\n] is "whitespace except newline", so matches never span lines. Uses
+# stdlib re for the finditer(pos, endpos) scan.
+_STREAM_TOKEN_RE = re.compile(
+    r"(?im)^[^\S\n]*(\[(?:INTRO|SHORTCODE(?:_[A-Z0-9]+)?|H[23]:[^\S\n]*.+)\])[^\S\n]*$"
+)
+
+
+# parse_outline_tokens: bracket token, bare INTRO/SHORTCODE, or bare heading
+# in one fullmatch; the matching group name picks the normalization.
+_OUTLINE_TOKEN_RE = _fastre.compile(
+    r"(?i)(?P<bracket>\[(?:INTRO|SHORTCODE(?:_[A-Z0-9]+)?|H[23]:\s*.+)\])"
+    r"|(?P<bare>INTRO|SHORTCODE(?:_[A-Z0-9]+)?)"
+    r"|(?P<heading>H[23]:\s*.+)"
+)
+# Every token (bracketed or bare) is at least 4 chars ("H2:x") and starts with
+# one of these, so most prose lines are rejected without running the regex.
+_OUTLINE_TOKEN_FIRST_CHARS = frozenset("[IiSsHh")
+
+
 OUTLINE_SECTION_SCHEMA = {
     "type": "object",
     "properties": {
@@ -48,6 +94,26 @@ OUTLINE_SECTION_SCHEMA = {
 }
 
 
+# Streamed outline tokens are flushed in small batches so the SSE consumer
+# is not woken once per line.
+OUTLINE_STREAM_BATCH_SIZE = 4
+OUTLINE_STREAM_FLUSH_SECONDS = 0.05
+
+# Sampling params for legacy token outlines (also part of the cache key).
+LEGACY_OUTLINE_TEMPERATURE = 0.3
+LEGACY_OUTLINE_MAX_TOKENS = 1000
+# Part of the outline cache key; bump whenever the legacy outline prompts or
+# token parsing change so outlines cached under the old prompt are not served.
+LEGACY_OUTLINE_PROMPT_VERSION = 1
+
+# Every outline path asks RAG the same (keyword, k, snippet_chars) question so
+# they share one query_articles cache entry; structured outlines trim locally.
+OUTLINE_RAG_K = 6
+OUTLINE_RAG_SNIPPET_CHARS = 800
+STRUCTURED_RAG_K = 5
+STRUCTURED_RAG_SNIPPET_CHARS = 600
+
+
 OUTLINE_SCHEMA = {
     "type": "object",
     "properties": {
@@ -61,21 +127,31 @@ OUTLINE_SCHEMA = {
     "additionalProperties": False,
 }
 
+OUTLINE_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "article_outline",
+        "description": "Structured outline for a promo article",
+        "schema": OUTLINE_SCHEMA,
+        "strict": True,
+    },
+}
 
-def today_long(tz: str = "US/Eastern") -> str:
-    """Get today's date in long format."""
-    try:
-        now = datetime.now(ZoneInfo(tz))
-    except Exception:
-        now = datetime.now()
-    return f"{now.strftime('%A')}, {now.strftime('%B')} {now.day}, {now.year}"
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_RETURNING_PROMOS_RE = re.compile(r"\b(returning|existing|current)\s+(?:player|players|customer|customers|user|users)\b")
 
 
 def _is_returning_promos_title(title_lower: str) -> bool:
     """Return True when the heading is about existing-customer promos."""
     if not title_lower:
         return False
-    return bool(re.search(r"\b(returning|existing|current)\s+(?:player|players|customer|customers|user|users)\b", title_lower))
+    return bool(_RETURNING_PROMOS_RE.search(title_lower))
+
+
+_FEATURED_GAME_RE = re.compile(r"Featured game:\s*(.+?)(?:\.\s+(?:Game time|Network):|$)", re.IGNORECASE)
+_FEATURED_EVENT_RE = re.compile(r"Featured event:\s*(.+?)(?:\.\s+(?:Game time|Network):|$)", re.IGNORECASE)
+_DIRECT_MATCHUP_RE = re.compile(r"([A-Za-z0-9 .'\-]+)\s+(?:vs\.?|@)\s+([A-Za-z0-9 .'\-]+)", re.IGNORECASE)
 
 
 def _extract_matchup_from_event_context(event_context: str) -> str:
@@ -83,26 +159,14 @@ def _extract_matchup_from_event_context(event_context: str) -> str:
     if not event_context:
         return ""
 
-    featured = re.search(
-        r"Featured game:\s*(.+?)(?:\.\s+(?:Game time|Network):|$)",
-        event_context,
-        flags=re.IGNORECASE,
-    )
+    featured = _FEATURED_GAME_RE.search(event_context)
     if featured:
         raw = featured.group(1).strip()
     else:
-        featured_event = re.search(
-            r"Featured event:\s*(.+?)(?:\.\s+(?:Game time|Network):|$)",
-            event_context,
-            flags=re.IGNORECASE,
-        )
+        featured_event = _FEATURED_EVENT_RE.search(event_context)
         if featured_event:
-            return re.sub(r"\s+", " ", featured_event.group(1).strip()).strip()
-        direct = re.search(
-            r"([A-Za-z0-9 .'\-]+)\s+(?:vs\.?|@)\s+([A-Za-z0-9 .'\-]+)",
-            event_context,
-            flags=re.IGNORECASE,
-        )
+            return _WHITESPACE_RE.sub(" ", featured_event.group(1).strip()).strip()
+        direct = _DIRECT_MATCHUP_RE.search(event_context)
         if not direct:
             return ""
         raw = f"{direct.group(1).strip()} vs. {direct.group(2).strip()}"
@@ -112,7 +176,7 @@ def _extract_matchup_from_event_context(event_context: str) -> str:
         if len(parts) == 2 and parts[0] and parts[1]:
             raw = f"{parts[0]} vs. {parts[1]}"
 
-    return re.sub(r"\s+", " ", raw).strip()
+    return _WHITESPACE_RE.sub(" ", raw).strip()
 
 
 def _headline_topic(
@@ -173,7 +237,7 @@ _MULTI_WORD_TEAM_ENDINGS = {
 
 def _short_team_label(name: str) -> str:
     """Condense full team names for editorial headings."""
-    clean = re.sub(r"\s+", " ", str(name or "").strip())
+    clean = _WHITESPACE_RE.sub(" ", str(name or "").strip())
     if not clean:
         return ""
     parts = clean.split(" ")
@@ -185,14 +249,17 @@ def _short_team_label(name: str) -> str:
     return parts[-1]
 
 
+_MATCHUP_SEPARATOR_RE = re.compile(r"\s+(?:vs\.?|@)\s+", re.IGNORECASE)
+
+
 def _compact_matchup_label(matchup: str) -> str:
     """Shorten team matchups while preserving non-team events."""
-    raw = re.sub(r"\s+", " ", str(matchup or "").strip())
+    raw = _WHITESPACE_RE.sub(" ", str(matchup or "").strip())
     if not raw:
         return ""
-    if not re.search(r"\s+(?:vs\.?|@)\s+", raw, flags=re.IGNORECASE):
+    if not _MATCHUP_SEPARATOR_RE.search(raw):
         return raw
-    parts = re.split(r"\s+(?:vs\.?|@)\s+", raw, maxsplit=1, flags=re.IGNORECASE)
+    parts = _MATCHUP_SEPARATOR_RE.split(raw, maxsplit=1)
     if len(parts) != 2:
         return raw
     left, right = [part.strip() for part in parts]
@@ -205,33 +272,36 @@ def _compact_matchup_label(matchup: str) -> str:
     return raw
 
 
+_CLAIM_TITLE_RE = re.compile(
+    r"(^using\b.*\b(code|offer|bonus)\b)|\b(how to claim|claim|how to use|worked example|bet example|quick example|example)\b|"
+    r"(bonus bets play out|welcome offer looks like|offer in action)"
+)
+_SIGNUP_TITLE_RE = re.compile(
+    r"\b(sign ?up|sign-up|signup|register|registration|create an? account|open an? account|"
+    r"get started|set ?up|setup|how to sign|how to register|how to join)\b"
+)
+_TERMS_TITLE_RE = re.compile(r"\b(terms|conditions|fine print|house rules|market rules|settlement)\b")
+
+
 def _is_claim_title(title_lower: str) -> bool:
     """Return True if the heading already functions as the claim/example section."""
     if not title_lower:
         return False
-    return bool(re.search(
-        r"(^using\b.*\b(code|offer|bonus)\b)|\b(how to claim|claim|how to use|worked example|bet example|quick example|example)\b|"
-        r"(bonus bets play out|welcome offer looks like|offer in action)",
-        title_lower,
-    ))
+    return bool(_CLAIM_TITLE_RE.search(title_lower))
 
 
 def _is_signup_title(title_lower: str) -> bool:
     """Return True if the heading already functions as the sign-up section."""
     if not title_lower:
         return False
-    return bool(re.search(
-        r"\b(sign ?up|sign-up|signup|register|registration|create an? account|open an? account|"
-        r"get started|set ?up|setup|how to sign|how to register|how to join)\b",
-        title_lower,
-    ))
+    return bool(_SIGNUP_TITLE_RE.search(title_lower))
 
 
 def _is_terms_title(title_lower: str) -> bool:
     """Return True if the heading already functions as the terms/fine print section."""
     if not title_lower:
         return False
-    return bool(re.search(r"\b(terms|conditions|fine print|house rules|market rules|settlement)\b", title_lower))
+    return bool(_TERMS_TITLE_RE.search(title_lower))
 
 
 def _classify_h2_section(title_lower: str) -> str:
@@ -691,13 +761,9 @@ def _market_compliance_block(market: str) -> str:
     )
 
 
-def _sanitize_outline_for_market(outline: list[dict], market: str) -> list[dict]:
-    """Remove common market-language leaks from model-generated outline guidance."""
-    market = str(market or "US").strip().upper()
-    if market != "CA":
-        return outline
-
-    replacements = [
+_CA_MARKET_REPLACEMENTS = tuple(
+    (re.compile(pattern, re.IGNORECASE), replacement)
+    for pattern, replacement in [
         (r"\b21\+\s+and\s+U\.?S\.?\s+residents\s+where\s+permitted(?:\s*\(void where prohibited\))?", "legal-age users in the listed Canadian provinces where permitted"),
         (r"\bU\.?S\.?\s+residents\s+where\s+permitted\b", "users in the listed Canadian provinces where permitted"),
         (r"\bU\.?S\.?\s+residents\b", "users in the listed Canadian provinces"),
@@ -710,13 +776,21 @@ def _sanitize_outline_for_market(outline: list[dict], market: str) -> list[dict]
         (r"\bstate-specific\b", "province-specific"),
         (r"\bnationwide\b", "available in listed provinces"),
     ]
+)
+
+
+def _sanitize_outline_for_market(outline: list[dict], market: str) -> list[dict]:
+    """Remove common market-language leaks from model-generated outline guidance."""
+    market = str(market or "US").strip().upper()
+    if market != "CA":
+        return outline
 
     def clean_text(value: Any) -> Any:
         if not isinstance(value, str):
             return value
         cleaned = value
-        for pattern, replacement in replacements:
-            cleaned = re.sub(pattern, replacement, cleaned, flags=re.IGNORECASE)
+        for pattern, replacement in _CA_MARKET_REPLACEMENTS:
+            cleaned = pattern.sub(replacement, cleaned)
         return cleaned
 
     cleaned_outline: list[dict] = []
@@ -729,6 +803,11 @@ def _sanitize_outline_for_market(outline: list[dict], market: str) -> list[dict]
     return cleaned_outline
 
 
+_TITLE_BOILERPLATE_RE = re.compile(r"\b(promo code|bonus code|offer details|welcome offer|bonus bets?)\b", re.IGNORECASE)
+_NON_TERM_CHARS_RE = re.compile(r"[^a-z0-9\.\-\s]")
+_EVENT_TOKEN_RE = re.compile(r"[A-Za-z0-9\.\-]{3,}")
+
+
 def _title_focus_terms(title: str, keyword: str, brand: str, event_context: str = "") -> list[str]:
     """Extract title-specific focus terms so H1 changes can reshape the outline."""
     raw = str(title or "").strip()
@@ -740,12 +819,12 @@ def _title_focus_terms(title: str, keyword: str, brand: str, event_context: str
             lower = lower.replace(removal, " ")
     if ":" in raw:
         lower = lower.split(":", 1)[1]
-    lower = re.sub(r"\b(promo code|bonus code|offer details|welcome offer|bonus bets?)\b", " ", lower, flags=re.IGNORECASE)
-    lower = re.sub(r"[^a-z0-9\.\-\s]", " ", lower)
+    lower = _TITLE_BOILERPLATE_RE.sub(" ", lower)
+    lower = _NON_TERM_CHARS_RE.sub(" ", lower)
     title_tokens = [token.strip() for token in lower.split() if token.strip() and len(token.strip()) > 2]
     event_tokens = {
         token.lower()
-        for token in re.findall(r"[A-Za-z0-9\.\-]{3,}", str(event_context or ""))
+        for token in _EVENT_TOKEN_RE.findall(str(event_context or ""))
     }
     deduped: list[str] = []
     for token in title_tokens:
@@ -761,7 +840,58 @@ def _title_focus_terms(title: str, keyword: str, brand: str, event_context: str
             result.append(token)
     return result[:8]
 
-async def generate_structured_outline(
+@lru_cache(maxsize=8)
+def _structured_outline_system_prompt(is_prediction_market: bool, is_dfs: bool) -> str:
+    """Static system prompt for structured outlines.
+
+    Identical across requests for a content mode (style guide included), so
+    providers can reuse the cached prompt prefix.
+    """
+    publication_label = (
+        "prediction market"
+        if is_prediction_market
+        else "daily fantasy"
+        if is_dfs
+        else "sports betting"
+    )
+    language_rule = (
+        "Use prediction-market language (trade, market, position, contract) and avoid sportsbook/bet/wager terms"
+        if is_prediction_market
+        else "Use DFS language (entries, contests, picks, fantasy app) and avoid sportsbook/bet/wager terms"
+        if is_dfs
+        else "Use natural sportsbook language with clear, factual mechanics"
+    )
+    return f"""You are a senior content strategist for a {publication_label} publication.
+Your job is to create a DETAILED CONTENT PLAN for a promo code article.
+
+CRITICAL: Each section must have UNIQUE talking points. Never repeat information across sections.
+The outline you create will be reviewed by human writers who may modify it.
+Do not mirror the H1 with boilerplate H2s. Avoid section titles that are just the keyword plus the matchup.
+
+Output a structured outline in this exact JSON format:
+{{
+  "outline": [
+    {{"level": "intro", "title": "", "talking_points": ["point 1", "point 2"], "avoid": []}},
+    {{"level": "shortcode", "title": "", "talking_points": [], "avoid": []}},
+    {{"level": "h2", "title": "Section Title", "talking_points": ["unique point 1", "unique point 2"], "avoid": ["thing covered elsewhere"]}}
+  ]
+}}
+
+RULES:
+- INTRO: 2-3 talking points about the hook, date, and offer value
+- SHORTCODE: Place after intro, between major sections, and before sign-up
+- H2 sections: Each needs 2-4 UNIQUE talking points
+- Follow the ARTICLE RULES in the request for H2 count, H3 use, formatting, and voice
+- "avoid" lists what other sections cover (to prevent repetition)
+- The first H2 should mention the topic naturally, but should not repeat the H1 wording
+- Do not create a standalone "Key Details" or "Eligibility" section
+- {language_rule}
+
+STYLE GUIDE (follow for tone/structure):
+{get_style_instructions()}"""
+
+
+async def _prepare_structured_outline(
     keyword: str,
     title: str,
     offer: dict[str, Any],
@@ -771,26 +901,10 @@ async def generate_structured_outline(
     competitor_context: str = "",
     variation_key: str = "",
     article_preferences: dict[str, Any] | None = None,
-) -> list[dict]:
-    """Generate a structured outline with unique talking points per section.
-
-    This is the PLAN stage - it creates an editable outline that writers
-    can review and modify before draft generation.
-
-    Args:
-        keyword: Primary keyword (e.g., "bet365 promo code")
-        title: Article title (H1)
-        offer: Offer dict from BAM API
-        event_context: Game/event context if applicable
-        bet_example: Pre-built bet example text
-        competitor_context: Scraped competitor content
+) -> dict[str, Any]:
+    """Build prompts and post-processing context for a structured outline.
 
-    Returns:
-        List of section dicts with:
-        - level: "intro", "shortcode", "h2", "h3"
-        - title: Section heading (empty for intro/shortcode)
-        - talking_points: List of unique points to cover
-        - avoid: List of things NOT to include (covered elsewhere)
+    Shared by generate_structured_outline and its streaming variant.
     """
     brand = offer.get("brand", "")
     offer_text = offer.get("offer_text", "")
@@ -799,7 +913,6 @@ async def generate_structured_outline(
     content_mode = get_content_mode_context(keyword, title, brand, offer_text)
     is_prediction_market = content_mode == CONTENT_MODE_PREDICTION_MARKET
     is_dfs = content_mode == CONTENT_MODE_DFS
-    style_guide = get_style_instructions()
     variation_key = variation_key or uuid4().hex
     prefs = _normalize_article_preferences(article_preferences)
     market = prefs["market"]
@@ -815,26 +928,15 @@ async def generate_structured_outline(
 
     # Get RAG snippets for style reference
     try:
-        hits = await query_articles(keyword, k=5, snippet_chars=600)
-        rag_context = "\n\n".join([h.get("snippet", "") for h in hits if h.get("snippet")])[:3000]
+        hits = await query_articles(keyword, k=OUTLINE_RAG_K, snippet_chars=OUTLINE_RAG_SNIPPET_CHARS)
+        rag_context = "\n\n".join([
+            h["snippet"][:STRUCTURED_RAG_SNIPPET_CHARS]
+            for h in hits[:STRUCTURED_RAG_K]
+            if h.get("snippet")
+        ])[:3000]
     except Exception:
         rag_context = ""
 
-    publication_label = (
-        "prediction market"
-        if is_prediction_market
-        else "daily fantasy"
-        if is_dfs
-        else "sports betting"
-    )
-    language_rule = (
-        "Use prediction-market language (trade, market, position, contract) and avoid sportsbook/bet/wager terms"
-        if is_prediction_market
-        else "Use DFS language (entries, contests, picks, fantasy app) and avoid sportsbook/bet/wager terms"
-        if is_dfs
-        else "Use natural sportsbook language with clear, factual mechanics"
-    )
-
     max_h2_sections = prefs["section_count"]
     h3_rule = "H3 subsections are allowed when they add real structure." if prefs["allow_h3"] else "Do not use H3 subsections in this outline."
     format_rule = (
@@ -852,35 +954,6 @@ async def generate_structured_outline(
         else "Use direct editorial phrasing."
     )
 
-    system_prompt = f"""You are a senior content strategist for a {publication_label} publication.
-Your job is to create a DETAILED CONTENT PLAN for a promo code article.
-
-CRITICAL: Each section must have UNIQUE talking points. Never repeat information across sections.
-The outline you create will be reviewed by human writers who may modify it.
-Do not mirror the H1 with boilerplate H2s. Avoid section titles that are just the keyword plus the matchup.
-
-Output a structured outline in this exact JSON format:
-{{
-  "outline": [
-    {{"level": "intro", "title": "", "talking_points": ["point 1", "point 2"], "avoid": []}},
-    {{"level": "shortcode", "title": "", "talking_points": [], "avoid": []}},
-    {{"level": "h2", "title": "Section Title", "talking_points": ["unique point 1", "unique point 2"], "avoid": ["thing covered elsewhere"]}}
-  ]
-}}
-
-RULES:
-- INTRO: 2-3 talking points about the hook, date, and offer value
-- SHORTCODE: Place after intro, between major sections, and before sign-up
-- H2 sections: Each needs 2-4 UNIQUE talking points
-- {h3_rule}
-- "avoid" lists what other sections cover (to prevent repetition)
-- Maximum {max_h2_sections} H2 sections total
-- The first H2 should mention the topic naturally, but should not repeat the H1 wording
-- Do not create a standalone "Key Details" or "Eligibility" section
-- {format_rule}
-- {voice_rule}
-- {language_rule}"""
-
     claim_point = (
         f"Use this worked example: {bet_example}"
         if bet_example
@@ -983,7 +1056,13 @@ RULES:
     ])
     required_structure_md = "\n".join(required_structure_lines)
 
-    user_prompt = f"""Create a detailed content plan for this article:
+    # Static instructions live in the cached system prompt; the RAG style
+    # examples (stable per keyword) lead the user prompt so regenerations share
+    # that prefix too, and per-request fields come last.
+    user_prompt = f"""STYLE EXAMPLES (match this tone):
+{rag_context or "(none available)"}
+
+Create a detailed content plan for this article:
 
 KEYWORD: {keyword}
 TITLE: {title}
@@ -1001,18 +1080,18 @@ OFFER DETAILS:
 COMPETITOR RESEARCH:
 {competitor_context[:2000] if competitor_context else "(none provided)"}
 
-STYLE GUIDE (follow for tone/structure):
-{style_guide}
-
-STYLE EXAMPLES (match this tone):
-{rag_context or "(none available)"}
-
 {competitor_research_goal}
 {title_focus_block}
 {secondary_keywords_block}
 {writer_prefs_block}
 {market_compliance_block}
 
+ARTICLE RULES:
+- {h3_rule}
+- Maximum {max_h2_sections} H2 sections total
+- {format_rule}
+- {voice_rule}
+
 REQUIRED STRUCTURE:
 {required_structure_md}
 
@@ -1032,10 +1111,98 @@ HEADING RULES:
 
 Output ONLY the JSON object, no other text:"""
 
+    return {
+        "system_prompt": _structured_outline_system_prompt(is_prediction_market, is_dfs),
+        "user_prompt": user_prompt,
+        "keyword": keyword,
+        "brand": brand,
+        "event_context": event_context,
+        "bet_example": bet_example,
+        "is_prediction_market": is_prediction_market,
+        "is_dfs": is_dfs,
+        "variation_key": variation_key,
+        "prefs": prefs,
+    }
+
+
+def _finalize_structured_outline(outline: list[dict], plan: dict[str, Any]) -> list[dict]:
+    """Apply shortcode, editorial, and market rules to a generated outline."""
+    outline = _ensure_shortcodes(outline)
+    outline = _apply_editorial_section_rules(
+        outline,
+        keyword=plan["keyword"],
+        brand=plan["brand"],
+        event_context=plan["event_context"],
+        is_prediction_market=plan["is_prediction_market"],
+        is_dfs=plan["is_dfs"],
+        variation_key=plan["variation_key"],
+        article_preferences=plan["prefs"],
+    )
+    return _sanitize_outline_for_market(outline, plan["prefs"]["market"])
+
+
+def _fallback_structured_outline(plan: dict[str, Any]) -> list[dict]:
+    """Default outline used when generation fails."""
+    outline = _get_default_outline(
+        plan["keyword"],
+        plan["brand"],
+        plan["event_context"],
+        plan["bet_example"],
+        is_prediction_market=plan["is_prediction_market"],
+        is_dfs=plan["is_dfs"],
+        variation_key=plan["variation_key"],
+        article_preferences=plan["prefs"],
+    )
+    return _sanitize_outline_for_market(outline, plan["prefs"]["market"])
+
+
+async def generate_structured_outline(
+    keyword: str,
+    title: str,
+    offer: dict[str, Any],
+    event_context: str = "",
+    article_date: str = "",
+    bet_example: str = "",
+    competitor_context: str = "",
+    variation_key: str = "",
+    article_preferences: dict[str, Any] | None = None,
+) -> list[dict]:
+    """Generate a structured outline with unique talking points per section.
+
+    This is the PLAN stage - it creates an editable outline that writers
+    can review and modify before draft generation.
+
+    Args:
+        keyword: Primary keyword (e.g., "bet365 promo code")
+        title: Article title (H1)
+        offer: Offer dict from BAM API
+        event_context: Game/event context if applicable
+        bet_example: Pre-built bet example text
+        competitor_context: Scraped competitor content
+
+    Returns:
+        List of section dicts with:
+        - level: "intro", "shortcode", "h2", "h3"
+        - title: Section heading (empty for intro/shortcode)
+        - talking_points: List of unique points to cover
+        - avoid: List of things NOT to include (covered elsewhere)
+    """
+    plan = await _prepare_structured_outline(
+        keyword,
+        title,
+        offer,
+        event_context=event_context,
+        article_date=article_date,
+        bet_example=bet_example,
+        competitor_context=competitor_context,
+        variation_key=variation_key,
+        article_preferences=article_preferences,
+    )
+
     try:
         data = await generate_completion_structured(
-            prompt=user_prompt,
-            system_prompt=system_prompt,
+            prompt=plan["user_prompt"],
+            system_prompt=plan["system_prompt"],
             schema=OUTLINE_SCHEMA,
             name="article_outline",
             description="Structured outline for a promo article",
@@ -1043,34 +1210,138 @@ Output ONLY the JSON object, no other text:"""
             max_tokens=2000,
         )
         outline = data.get("outline", []) if isinstance(data, dict) else []
-        outline = _ensure_shortcodes(outline)
-        outline = _apply_editorial_section_rules(
-            outline,
-            keyword=keyword,
-            brand=brand,
-            event_context=event_context,
-            is_prediction_market=is_prediction_market,
-            is_dfs=is_dfs,
-            variation_key=variation_key,
-            article_preferences=prefs,
-        )
-        outline = _sanitize_outline_for_market(outline, market)
-        return outline
+        return _finalize_structured_outline(outline, plan)
     except Exception as e:
         print(f"Failed to generate structured outline: {e}")
 
     # Fallback to default structure
-    outline = _get_default_outline(
+    return _fallback_structured_outline(plan)
+
+
+class _OutlineSectionParser:
+    """Incrementally pull closed section objects out of streamed outline JSON.
+
+    Tracks bracket depth (skipping string literals) across chunks and emits
+    each element of the outline array as soon as its closing brace arrives.
+    Text before an open section is discarded, so the buffer stays small.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._stack: list[str] = []
+        self._in_str = False
+        self._esc = False
+        self._start = -1
+        self._section_depth = -1
+
+    def feed(self, chunk: str) -> list[dict]:
+        scan_from = len(self._buffer)
+        self._buffer += chunk
+        buffer = self._buffer
+        stack = self._stack
+        sections: list[dict] = []
+
+        for i in range(scan_from, len(buffer)):
+            ch = buffer[i]
+            if self._in_str:
+                if self._esc:
+                    self._esc = False
+                elif ch == "\\":
+                    self._esc = True
+                elif ch == '"':
+                    self._in_str = False
+                continue
+            if ch == '"':
+                self._in_str = True
+            elif ch == "{" or ch == "[":
+                # Section objects open directly inside the first (outline) array
+                if ch == "{" and self._start == -1 and stack and stack[-1] == "[" and stack.count("[") == 1:
+                    self._start = i
+                    self._section_depth = len(stack)
+                stack.append(ch)
+            elif ch == "}" or ch == "]":
+                if stack:
+                    stack.pop()
+                if ch == "}" and self._start != -1 and len(stack) == self._section_depth:
+                    section = self._load_section(buffer[self._start:i + 1])
+                    if section is not None:
+                        sections.append(section)
+                    self._start = -1
+
+        if self._start == -1:
+            self._buffer = ""
+        elif self._start:
+            self._buffer = buffer[self._start:]
+            self._start = 0
+        return sections
+
+    @staticmethod
+    def _load_section(raw: str) -> dict | None:
+        try:
+            section = json.loads(raw)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(section, dict):
+            return None
+        level = str(section.get("level", ""))
+        if level not in ("intro", "h2", "h3") and not level.startswith("shortcode"):
+            return None
+        return section
+
+
+async def generate_structured_outline_streaming(
+    keyword: str,
+    title: str,
+    offer: dict[str, Any],
+    event_context: str = "",
+    article_date: str = "",
+    bet_example: str = "",
+    competitor_context: str = "",
+    variation_key: str = "",
+    article_preferences: dict[str, Any] | None = None,
+) -> AsyncGenerator[dict, None]:
+    """Streaming variant of generate_structured_outline.
+
+    Yields ``{"type": "section", "data": section}`` as each outline section
+    closes in the streamed JSON, then ``{"type": "done", "outline": [...]}``
+    with the post-processed outline (shortcodes, editorial and market rules
+    applied). Streamed sections are provisional; the ``done`` outline
+    replaces them. If the stream fails midway, the sections received so far
+    are finalized; the default outline is used only when none arrived.
+    """
+    plan = await _prepare_structured_outline(
         keyword,
-        brand,
-        event_context,
-        bet_example,
-        is_prediction_market=is_prediction_market,
-        is_dfs=is_dfs,
+        title,
+        offer,
+        event_context=event_context,
+        article_date=article_date,
+        bet_example=bet_example,
+        competitor_context=competitor_context,
         variation_key=variation_key,
-        article_preferences=prefs,
+        article_preferences=article_preferences,
     )
-    return _sanitize_outline_for_market(outline, market)
+
+    parser = _OutlineSectionParser()
+    sections: list[dict] = []
+    try:
+        async for chunk in generate_completion_streaming(
+            prompt=plan["user_prompt"],
+            system_prompt=plan["system_prompt"],
+            temperature=get_temperature_by_section("outline"),
+            max_tokens=2000,
+            response_format=OUTLINE_RESPONSE_FORMAT,
+        ):
+            for section in parser.feed(chunk):
+                sections.append(section)
+                yield {"type": "section", "data": section}
+    except Exception as e:
+        print(f"Failed to stream structured outline: {e}")
+
+    if sections:
+        outline = _finalize_structured_outline(sections, plan)
+    else:
+        outline = _fallback_structured_outline(plan)
+    yield {"type": "done", "outline": outline}
 
 
 def _ensure_shortcodes(outline: list[dict]) -> list[dict]:
@@ -1111,19 +1382,120 @@ def _ensure_shortcodes(outline: list[dict]) -> list[dict]:
 
     # Ensure we have intro at start if missing
     if not has_intro and result and result[0].get("level") != "intro":
-        result.insert(0, {
-            "level": "intro",
-            "title": "",
-            "talking_points": ["Hook with date and offer value", "Mention the code only if one is required"],
-            "avoid": [],
-        })
-        result.insert(1, {"level": "shortcode", "title": "", "talking_points": [], "avoid": []})
+        result[:0] = [
+            {
+                "level": "intro",
+                "title": "",
+                "talking_points": ["Hook with date and offer value", "Mention the code only if one is required"],
+                "avoid": [],
+            },
+            {"level": "shortcode", "title": "", "talking_points": [], "avoid": []},
+        ]
 
     return result
 
 
-def _get_default_outline(
-    keyword: str,
+# Default outline skeleton. Mode-dependent text is a (sports, prediction
+# market, DFS) tuple; "title" names a _contextual_section_titles key.
+_DEFAULT_EXAMPLE_POINT = (
+    "Worked example with $50 bet",
+    "Worked example with a $50 market position",
+    "Worked example with a $50 DFS contest entry",
+)
+_DEFAULT_SHORTCODE_SECTION = {"level": "shortcode", "title": None, "talking_points": (), "avoid": ()}
+_DEFAULT_OUTLINE_TEMPLATE = (
+    {
+        "level": "intro",
+        "title": None,
+        "talking_points": (
+            "Hook with today's date and {brand} offer value",
+            "Mention the code naturally if one is required",
+            "State explicit eligible states without calling the offer nationwide",
+        ),
+        "avoid": (),
+    },
+    _DEFAULT_SHORTCODE_SECTION,
+    {
+        "level": "h2",
+        "title": "overview",
+        "talking_points": (
+            (
+                "Why this offer is valuable for bettors",
+                "Why this offer is valuable for prediction-market users",
+                "Why this offer is valuable for DFS players",
+            ),
+            "Timing advantage (sign up now)",
+            "What makes it stand out from other promos",
+            "{angle}",
+        ),
+        "avoid": ("Step-by-step claiming instructions", "Full terms details", "Repeating the H1 wording"),
+    },
+    _DEFAULT_SHORTCODE_SECTION,
+    {
+        "level": "h2",
+        "title": "claim",
+        "talking_points": (
+            "{example}",
+            (
+                "Show win scenario with profit calculation",
+                "Show settlement scenario with payout calculation",
+                "Show contest outcome example and payout logic",
+            ),
+            (
+                "Show loss scenario with bonus bet receipt",
+                "Show loss scenario and how promo credits can be used",
+                "Show non-cash outcome and how bonus entries/credits apply",
+            ),
+        ),
+        "avoid": ("Restating what the offer is", "Eligibility requirements"),
+    },
+    _DEFAULT_SHORTCODE_SECTION,
+    {
+        # Sportsbook-only, and only when the writer keeps Daily Promos
+        "level": "h2",
+        "title": "daily_promos",
+        "talking_points": (
+            "Placeholder only for today's rotating promos (editor updates daily)",
+            "List sportsbook, offer, code, and state availability",
+            "Do not prefill this section with live promo copy",
+        ),
+        "avoid": ("Using stale promos from previous days",),
+    },
+    {
+        "level": "h2",
+        "title": "signup",
+        "talking_points": (
+            "Step 1: Visit site/app",
+            "Step 2: Click Join/Register",
+            "Step 3: Enter promo code",
+            "Step 4: Complete verification",
+            (
+                "Step 5: Make deposit and place first bet",
+                "Step 5: Fund account and place first market position",
+                "Step 5: Fund account and enter first contest",
+            ),
+        ),
+        "avoid": ("Offer details", "Terms explanation"),
+    },
+    {
+        "level": "h2",
+        "title": "terms",
+        "talking_points": (
+            "Reference to full terms on operator site",
+            "Key restrictions summary",
+            (
+                "Responsible gaming reminder with helpline",
+                "Eligibility and settlement notes",
+                "Eligibility, contest rules, and expiration notes",
+            ),
+        ),
+        "avoid": ("Repeating eligibility copy from above", "Claiming steps"),
+    },
+)
+
+
+def _get_default_outline(
+    keyword: str,
     brand: str,
     event_context: str = "",
     bet_example: str = "",
@@ -1142,119 +1514,34 @@ def _get_default_outline(
         is_dfs=is_dfs,
         variation_key=variation_key,
     )
-    default_example_point = (
-        "Worked example with a $50 market position"
-        if is_prediction_market
-        else "Worked example with a $50 DFS contest entry"
-        if is_dfs
-        else "Worked example with $50 bet"
-    )
+    mode = 1 if is_prediction_market else 2 if is_dfs else 0
+    include_daily_promos = prefs["include_daily_promos"] and mode == 0
+    fills = {
+        "{example}": bet_example or _DEFAULT_EXAMPLE_POINT[mode],
+        "{angle}": (
+            "Work in a secondary keyword or title-specific angle when it helps"
+            if prefs["secondary_keywords"]
+            else "Keep the framing aligned with the H1 angle"
+        ),
+    }
+
+    def _point(point: str | tuple[str, str, str]) -> str:
+        if isinstance(point, tuple):
+            return point[mode]
+        if point in fills:
+            return fills[point]
+        return point.format(brand=brand) if "{" in point else point
+
     outline = [
         {
-            "level": "intro",
-            "title": "",
-            "talking_points": [
-                f"Hook with today's date and {brand} offer value",
-                "Mention the code naturally if one is required",
-                "State explicit eligible states without calling the offer nationwide",
-            ],
-            "avoid": [],
-        },
-        {
-            "level": "shortcode",
-            "title": "",
-            "talking_points": [],
-            "avoid": [],
-        },
-        {
-            "level": "h2",
-            "title": titles["overview"],
-            "talking_points": [
-                "Why this offer is valuable for bettors"
-                if not is_prediction_market and not is_dfs
-                else "Why this offer is valuable for prediction-market users"
-                if is_prediction_market
-                else "Why this offer is valuable for DFS players",
-                "Timing advantage (sign up now)",
-                "What makes it stand out from other promos",
-                "Work in a secondary keyword or title-specific angle when it helps"
-                if prefs["secondary_keywords"]
-                else "Keep the framing aligned with the H1 angle",
-            ],
-            "avoid": ["Step-by-step claiming instructions", "Full terms details", "Repeating the H1 wording"],
-        },
-        {
-            "level": "shortcode",
-            "title": "",
-            "talking_points": [],
-            "avoid": [],
-        },
-        {
-            "level": "h2",
-            "title": titles["claim"],
-            "talking_points": [
-                bet_example if bet_example else default_example_point,
-                "Show win scenario with profit calculation"
-                if not is_prediction_market and not is_dfs
-                else "Show settlement scenario with payout calculation"
-                if is_prediction_market
-                else "Show contest outcome example and payout logic",
-                "Show loss scenario with bonus bet receipt"
-                if not is_prediction_market and not is_dfs
-                else "Show loss scenario and how promo credits can be used"
-                if is_prediction_market
-                else "Show non-cash outcome and how bonus entries/credits apply",
-            ],
-            "avoid": ["Restating what the offer is", "Eligibility requirements"],
-        },
-        {
-            "level": "shortcode",
-            "title": "",
-            "talking_points": [],
-            "avoid": [],
-        },
-        {
-            "level": "h2",
-            "title": titles["signup"],
-            "talking_points": [
-                "Step 1: Visit site/app",
-                "Step 2: Click Join/Register",
-                "Step 3: Enter promo code",
-                "Step 4: Complete verification",
-                "Step 5: Make deposit and place first bet"
-                if not is_prediction_market and not is_dfs
-                else "Step 5: Fund account and place first market position"
-                if is_prediction_market
-                else "Step 5: Fund account and enter first contest",
-            ],
-            "avoid": ["Offer details", "Terms explanation"],
-        },
-        {
-            "level": "h2",
-            "title": titles["terms"],
-            "talking_points": [
-                "Reference to full terms on operator site",
-                "Key restrictions summary",
-                "Responsible gaming reminder with helpline"
-                if not is_prediction_market and not is_dfs
-                else "Eligibility and settlement notes"
-                if is_prediction_market
-                else "Eligibility, contest rules, and expiration notes",
-            ],
-            "avoid": ["Repeating eligibility copy from above", "Claiming steps"],
-        },
+            "level": section["level"],
+            "title": titles[section["title"]] if section["title"] else "",
+            "talking_points": [_point(p) for p in section["talking_points"]],
+            "avoid": list(section["avoid"]),
+        }
+        for section in _DEFAULT_OUTLINE_TEMPLATE
+        if section["title"] != "daily_promos" or include_daily_promos
     ]
-    if prefs["include_daily_promos"] and not is_prediction_market and not is_dfs:
-        outline.insert(6, {
-            "level": "h2",
-            "title": titles["daily_promos"],
-            "talking_points": [
-                "Placeholder only for today's rotating promos (editor updates daily)",
-                "List sportsbook, offer, code, and state availability",
-                "Do not prefill this section with live promo copy",
-            ],
-            "avoid": ["Using stale promos from previous days"],
-        })
     return _apply_editorial_section_rules(
         outline,
         keyword=keyword,
@@ -1266,6 +1553,33 @@ def _get_default_outline(
         article_preferences=prefs,
     )
 
+
+def _outline_text_lines(outline: list[dict]):
+    """Yield the editable text lines for each outline section."""
+    for section in outline:
+        level = section.get("level", "h2")
+
+        # Section header
+        if level == "intro":
+            yield "[INTRO]"
+        elif str(level).startswith("shortcode"):
+            token = str(level).upper()
+            yield "[SHORTCODE]" if token == "SHORTCODE" else f"[{token}]"
+        elif level in ("h2", "h3"):
+            yield f"[{level.upper()}: {section.get('title', '')}]"
+
+        # Talking points
+        for point in section.get("talking_points", []):
+            yield f"> {point}"
+
+        # Avoid list
+        avoid = section.get("avoid", [])
+        if avoid:
+            yield f"! Avoid: {', '.join(avoid)}"
+
+        yield ""  # Blank line between sections
+
+
 def outline_to_text(outline: list[dict]) -> str:
     """Convert structured outline to editable text format.
 
@@ -1287,37 +1601,7 @@ def outline_to_text(outline: list[dict]) -> str:
     Returns:
         Editable text representation
     """
-    lines = []
-
-    for section in outline:
-        level = section.get("level", "h2")
-        title = section.get("title", "")
-        talking_points = section.get("talking_points", [])
-        avoid = section.get("avoid", [])
-
-        # Section header
-        if level == "intro":
-            lines.append("[INTRO]")
-        elif str(level).startswith("shortcode"):
-            token = str(level).upper()
-            if token == "SHORTCODE":
-                lines.append("[SHORTCODE]")
-            else:
-                lines.append(f"[{token}]")
-        elif level in ("h2", "h3"):
-            lines.append(f"[{level.upper()}: {title}]")
-
-        # Talking points
-        for point in talking_points:
-            lines.append(f"> {point}")
-
-        # Avoid list
-        if avoid:
-            lines.append(f"! Avoid: {', '.join(avoid)}")
-
-        lines.append("")  # Blank line between sections
-
-    return "\n".join(lines).strip()
+    return "\n".join(_outline_text_lines(outline)).strip()
 
 
 def text_to_outline(text: str) -> list[dict]:
@@ -1338,10 +1622,10 @@ def text_to_outline(text: str) -> list[dict]:
             continue
 
         # Check for section headers
-        intro_match = re.match(r"^\[INTRO\]$", line, re.IGNORECASE)
-        shortcode_match = re.match(r"^\[(SHORTCODE(?:_[A-Z0-9]+)?)\]$", line, re.IGNORECASE)
-        h2_match = re.match(r"^\[H2:\s*(.+)\]$", line, re.IGNORECASE)
-        h3_match = re.match(r"^\[H3:\s*(.+)\]$", line, re.IGNORECASE)
+        intro_match = _INTRO_LINE_RE.match(line)
+        shortcode_match = _SHORTCODE_LINE_RE.match(line)
+        h2_match = _H2_LINE_RE.match(line)
+        h3_match = _H3_LINE_RE.match(line)
 
         if intro_match:
             if current_section:
@@ -1387,7 +1671,7 @@ def text_to_outline(text: str) -> list[dict]:
                 current_section["talking_points"].append(point)
         elif line.startswith("!") and current_section:
             # Avoid directive
-            avoid_match = re.match(r"^!\s*Avoid:\s*(.+)$", line, re.IGNORECASE)
+            avoid_match = _AVOID_LINE_RE.match(line)
             if avoid_match:
                 avoid_items = [a.strip() for a in avoid_match.group(1).split(",")]
                 current_section["avoid"].extend(avoid_items)
@@ -1410,11 +1694,31 @@ def validate_outline(outline: list[dict], keyword: str) -> list[str]:
         List of warning/error messages (empty if valid)
     """
     warnings = []
+    point_warnings = []
+    keyword_lower = keyword.lower()
 
-    # Count section types
-    h2_count = sum(1 for s in outline if s.get("level") == "h2")
-    shortcode_count = sum(1 for s in outline if str(s.get("level", "")).startswith("shortcode"))
-    has_intro = any(s.get("level") == "intro" for s in outline)
+    # Single pass: count section types, keyword coverage, and thin sections
+    h2_count = 0
+    shortcode_count = 0
+    has_intro = False
+    first_h2_title: str | None = None
+    keyword_in_h2s = 0
+    for section in outline:
+        level = section.get("level")
+        if level == "h2":
+            h2_count += 1
+            title_lower = section.get("title", "").lower()
+            if first_h2_title is None:
+                first_h2_title = title_lower
+            if keyword_lower in title_lower:
+                keyword_in_h2s += 1
+        elif level == "intro":
+            has_intro = True
+        elif str(level or "").startswith("shortcode"):
+            shortcode_count += 1
+
+        if level in ("h2", "h3") and len(section.get("talking_points", [])) < 2:
+            point_warnings.append(f"Section '{section.get('title', 'Untitled')}' has too few talking points")
 
     # Structure checks
     if not has_intro:
@@ -1429,23 +1733,14 @@ def validate_outline(outline: list[dict], keyword: str) -> list[str]:
         warnings.append("Consider adding more [SHORTCODE] placements for CTAs")
 
     # Keyword in headings check
-    keyword_lower = keyword.lower()
-    h2_titles = [s.get("title", "").lower() for s in outline if s.get("level") == "h2"]
-
-    if h2_titles and keyword_lower not in h2_titles[0]:
+    if first_h2_title is not None and keyword_lower not in first_h2_title:
         warnings.append(f"First H2 should contain keyword '{keyword}'")
 
-    keyword_in_h2s = sum(1 for t in h2_titles if keyword_lower in t)
     if keyword_in_h2s < 2:
         warnings.append(f"Keyword '{keyword}' only in {keyword_in_h2s} H2 titles (recommend 3+)")
 
     # Talking points check
-    for section in outline:
-        if section.get("level") in ("h2", "h3"):
-            points = section.get("talking_points", [])
-            if len(points) < 2:
-                warnings.append(f"Section '{section.get('title', 'Untitled')}' has too few talking points")
-
+    warnings.extend(point_warnings)
     return warnings
 
 
@@ -1465,8 +1760,38 @@ DEFAULT_TOKENS = [
 ]
 
 
+def _semantic_outline_scope(
+    variant: str,
+    brand: str,
+    offer_text: str,
+    num_offers: int,
+    content_mode: str,
+    **context: str,
+) -> dict[str, Any]:
+    """Inputs that must match exactly before a semantically similar outline is reused.
+
+    Covers every outline cache key field except the embedded keyword/title;
+    ``context`` carries the variant's extra prompt inputs (game, state, ...).
+    """
+    return {
+        "variant": variant,
+        "prompt_version": LEGACY_OUTLINE_PROMPT_VERSION,
+        "brand": brand.strip(),
+        "offer_text": offer_text.strip(),
+        "num_offers": num_offers,
+        "content_mode": content_mode,
+        **context,
+    }
+
+
 def _default_tokens_multi(num_offers: int = 1, keyword: str = "Offer") -> list[str]:
     """Build a lean default token set with multi-offer shortcodes."""
+    # Three or more offers share one layout, so clamp to keep the cache small.
+    return list(_default_tokens_multi_cached(min(num_offers, 3), keyword))
+
+
+@lru_cache(maxsize=64)
+def _default_tokens_multi_cached(num_offers: int, keyword: str) -> tuple[str, ...]:
     main_shortcode = "[SHORTCODE_MAIN]" if num_offers > 1 else "[SHORTCODE]"
     tokens = [
         "[INTRO]",
@@ -1485,7 +1810,7 @@ def _default_tokens_multi(num_offers: int = 1, keyword: str = "Offer") -> list[s
         f"[H2: How to Sign Up for {keyword}]",
         "[H2: Terms & Conditions]",
     ])
-    return tokens
+    return tuple(tokens)
 
 
 def parse_outline_tokens(text: str, default_shortcode_token: str = "[SHORTCODE]") -> list[str]:
@@ -1497,16 +1822,19 @@ def parse_outline_tokens(text: str, default_shortcode_token: str = "[SHORTCODE]"
     tokens = []
     for line in text.split("\n"):
         line = line.strip()
-        if not line:
+        if len(line) < 4 or line[0] not in _OUTLINE_TOKEN_FIRST_CHARS:
             continue
 
-        # Match bracket tokens
-        if re.match(r"^\[(?:INTRO|SHORTCODE(?:_[A-Z0-9]+)?|H[23]:\s*.+)\]$", line, re.IGNORECASE):
+        match = _OUTLINE_TOKEN_RE.fullmatch(line)
+        if match is None:
+            continue
+        kind = match.lastgroup
+        if kind == "bracket":
             tokens.append(line)
         # Also accept lines that look like tokens without brackets
-        elif re.match(r"^(INTRO|SHORTCODE(?:_[A-Z0-9]+)?)$", line, re.IGNORECASE):
+        elif kind == "bare":
             tokens.append(f"[{line.upper()}]")
-        elif re.match(r"^H[23]:\s*.+$", line, re.IGNORECASE):
+        else:
             tokens.append(f"[{line}]")
 
     if not tokens:
@@ -1514,35 +1842,49 @@ def parse_outline_tokens(text: str, default_shortcode_token: str = "[SHORTCODE]"
             return _default_tokens_multi(num_offers=2, keyword="Offer")
         return DEFAULT_TOKENS
 
+    # Uppercase each token once; predicates below index into this view
+    upper = [t.upper() for t in tokens]
+
     # Ensure [INTRO] and [SHORTCODE] are at the start
-    has_intro = any(t.upper() == "[INTRO]" for t in tokens)
-    has_shortcode = any(t.upper().startswith("[SHORTCODE") for t in tokens)
+    has_intro = "[INTRO]" in upper
+    has_shortcode = any(u.startswith("[SHORTCODE") for u in upper)
 
     if not has_intro:
         tokens.insert(0, "[INTRO]")
+        upper.insert(0, "[INTRO]")
     if not has_shortcode:
         # Insert after INTRO
-        intro_idx = next((i for i, t in enumerate(tokens) if t.upper() == "[INTRO]"), -1)
+        intro_idx = upper.index("[INTRO]")
         tokens.insert(intro_idx + 1, default_shortcode_token)
+        upper.insert(intro_idx + 1, default_shortcode_token.upper())
+
+    return _reposition_alt_shortcodes(tokens, upper)
 
-    return _reposition_alt_shortcodes(tokens)
 
+_ALT_SHORTCODE_TOKENS = ("[SHORTCODE_1]", "[SHORTCODE_2]")
 
-def _reposition_alt_shortcodes(tokens: list[str]) -> list[str]:
-    """Place alt shortcodes immediately after the first shortcode token."""
-    alt_tokens = [t for t in tokens if t.upper() in ("[SHORTCODE_1]", "[SHORTCODE_2]")]
+
+def _reposition_alt_shortcodes(tokens: list[str], upper: list[str] | None = None) -> list[str]:
+    """Place alt shortcodes immediately after the first shortcode token.
+
+    ``upper`` is an optional precomputed uppercase view of ``tokens``.
+    """
+    if upper is None:
+        upper = [t.upper() for t in tokens]
+
+    alt_tokens = [t for t, u in zip(tokens, upper) if u in _ALT_SHORTCODE_TOKENS]
     if not alt_tokens:
         return tokens
 
-    tokens = [t for t in tokens if t.upper() not in ("[SHORTCODE_1]", "[SHORTCODE_2]")]
+    kept = [(t, u) for t, u in zip(tokens, upper) if u not in _ALT_SHORTCODE_TOKENS]
+    tokens = [t for t, _ in kept]
 
-    insert_idx = next((i for i, t in enumerate(tokens) if t.upper().startswith("[SHORTCODE")), -1)
+    insert_idx = next((i for i, (_, u) in enumerate(kept) if u.startswith("[SHORTCODE")), -1)
     if insert_idx == -1:
-        intro_idx = next((i for i, t in enumerate(tokens) if t.upper() == "[INTRO]"), -1)
+        intro_idx = next((i for i, (_, u) in enumerate(kept) if u == "[INTRO]"), -1)
         insert_idx = intro_idx
 
-    for offset, tok in enumerate(alt_tokens):
-        tokens.insert(insert_idx + 1 + offset, tok)
+    tokens[insert_idx + 1:insert_idx + 1] = alt_tokens
 
     return tokens
 
@@ -1576,39 +1918,44 @@ def structured_to_tokens(outline: list[dict]) -> list[str]:
     return tokens
 
 
-async def generate_outline(
-    keyword: str,
-    title: str,
-    offer_text: str = "",
-    brand: str = "",
-    state: str = "ALL",
-    competitor_context: str = "",
-    style_profile: str = "Top Stories – Informative",
-    game_context: str = "",
-    num_offers: int = 1,
-) -> list[str]:
-    """Generate article outline using RAG and LLM (legacy format).
+@lru_cache(maxsize=8)
+def _outline_system_prompt(is_prediction_market: bool, is_dfs: bool, streaming: bool = False) -> str:
+    """Static system prompt for legacy token outlines.
 
-    Returns list of outline tokens.
+    Identical across requests for a content mode, so providers can reuse the
+    cached prompt prefix. The streaming generator keeps its own rule set.
     """
-    # Get RAG context
-    rag_snippets = await query_articles(keyword, k=6, snippet_chars=800)
-    rag_context = "\n\n".join([
-        f"[{s['source']}]: {s['snippet']}"
-        for s in rag_snippets
-    ]) or "(No relevant articles found)"
-    content_mode = get_content_mode_context(keyword, title, brand, offer_text)
-    is_prediction_market = content_mode == CONTENT_MODE_PREDICTION_MARKET
-    is_dfs = content_mode == CONTENT_MODE_DFS
-    section_titles = _contextual_section_titles(
-        keyword,
-        brand,
-        game_context,
-        is_prediction_market=is_prediction_market,
-        is_dfs=is_dfs,
-    )
+    if streaming:
+        publication_label = (
+            "prediction-market"
+            if is_prediction_market
+            else "DFS"
+            if is_dfs
+            else "sports betting"
+        )
+        language_rule = (
+            "Avoid sportsbook/betting terminology for this operator"
+            if is_prediction_market or is_dfs
+            else "Use natural sportsbook terminology"
+        )
+        return f"""You are an SEO content planner specializing in {publication_label} promotional content.
+Your task is to create a structured article outline using bracket tokens.
+
+Output format (one token per line):
+[INTRO] - Opening paragraph hook
+[SHORTCODE] - Promo module placement (or [SHORTCODE_MAIN]/[SHORTCODE_1]/[SHORTCODE_2])
+[H2: Section Title] - Main sections
+[H3: Subsection Title] - Subsections under H2s
+
+Rules:
+- Start with [INTRO] then [SHORTCODE]
+- Use 4-5 H2 sections
+- Use H3 subsections sparingly (0-3 per H2)
+- Keep titles concise, contextual, and keyword-relevant
+- Include a Daily Promos section placeholder
+- Output ONLY the tokens, no explanations
+- {language_rule}"""
 
-    # Build prompt - keep it tight to avoid bloated outlines
     language_rule = (
         "Use prediction-market language and avoid sportsbook/betting terms"
         if is_prediction_market
@@ -1616,7 +1963,7 @@ async def generate_outline(
         if is_dfs
         else "Use clear sportsbook language"
     )
-    system_prompt = f"""You are an SEO content planner for short, timely Top Stories promo articles.
+    return f"""You are an SEO content planner for short, timely Top Stories promo articles.
 Output a lean outline using bracket tokens. One item per line.
 
 Format:
@@ -1635,6 +1982,65 @@ CRITICAL RULES:
 - Output ONLY tokens, no explanations
 - {language_rule}"""
 
+
+def _build_outline_prompt(
+    keyword: str,
+    title: str,
+    *,
+    brand: str,
+    offer_text: str,
+    num_offers: int,
+    section_titles: dict[str, str],
+    is_prediction_market: bool,
+    is_dfs: bool,
+    streaming: bool = False,
+    rag_context: str = "",
+    game_context: str = "",
+    state: str = "",
+    style_profile: str = "",
+    competitor_context: str = "",
+) -> tuple[str, str, str]:
+    """Build (system_prompt, user_prompt, shortcode_token) for token outlines.
+
+    Shared by generate_outline and generate_outline_streaming; each keeps its
+    own wording. Static rules live in the cached system prompt, per-request
+    values in the user prompt. Only the streaming prompt carries the RAG
+    structure examples, state, style and competitor context.
+    """
+    shortcode_token = "[SHORTCODE_MAIN]" if num_offers > 1 else "[SHORTCODE]"
+    system_prompt = _outline_system_prompt(is_prediction_market, is_dfs, streaming)
+
+    if streaming:
+        user_prompt = f"""Create an article outline for:
+
+KEYWORD: {keyword}
+TITLE: {title}
+BRAND: {brand or "(none)"}
+OFFER: {offer_text or "(none)"}
+STATE: {state}
+STYLE: {style_profile}
+
+REQUIRED STRUCTURE (follow this pattern):
+[INTRO]
+[SHORTCODE_MAIN]
+[H2: {section_titles['overview']}]
+[H2: {section_titles['claim']}]
+[SHORTCODE_MAIN]
+[H2: {section_titles['daily_promos']}]
+[H2: {section_titles['signup']}]
+[H2: {section_titles['terms']}]
+
+STRUCTURE EXAMPLES (use for outline format inspiration, NOT content):
+These show how we typically structure similar articles.
+{rag_context}
+
+{f"COMPETITOR CONTEXT:{chr(10)}{competitor_context}" if competitor_context else ""}
+
+You have {num_offers} total offer(s). If more than 1, include [SHORTCODE_1] and [SHORTCODE_2] tokens.
+
+Generate the outline tokens now:"""
+        return system_prompt, user_prompt, shortcode_token
+
     user_prompt = f"""Create an outline for:
 
 KEYWORD: {keyword}
@@ -1661,19 +2067,97 @@ If multiple offers are selected, also include:
 You have {num_offers} total offer(s).
 
 Adjust headings to match the keyword. Output tokens now:"""
+    return system_prompt, user_prompt, shortcode_token
+
+
+async def generate_outline(
+    keyword: str,
+    title: str,
+    offer_text: str = "",
+    brand: str = "",
+    state: str = "ALL",
+    competitor_context: str = "",
+    style_profile: str = "Top Stories – Informative",
+    game_context: str = "",
+    num_offers: int = 1,
+) -> list[str]:
+    """Generate article outline using RAG and LLM (legacy format).
+
+    Returns list of outline tokens. Identical requests within
+    OUTLINE_CACHE_TTL_SECONDS are served from the outline cache.
+    """
+    content_mode = get_content_mode_context(keyword, title, brand, offer_text)
+    is_prediction_market = content_mode == CONTENT_MODE_PREDICTION_MARKET
+    is_dfs = content_mode == CONTENT_MODE_DFS
+    cache_key = outline_cache_key(
+        variant="outline",
+        prompt_version=LEGACY_OUTLINE_PROMPT_VERSION,
+        keyword=keyword.strip(),
+        title=title.strip(),
+        brand=brand.strip(),
+        offer_text=offer_text,
+        game_context=game_context,
+        num_offers=num_offers,
+        content_mode=content_mode,
+        temperature=LEGACY_OUTLINE_TEMPERATURE,
+        max_tokens=LEGACY_OUTLINE_MAX_TOKENS,
+    )
+    cached = await outline_cache.lookup(cache_key)
+    if cached is not None:
+        return cached
+
+    # Near-duplicate keyword/title for the same offer setup
+    semantic_scope = _semantic_outline_scope(
+        "outline", brand, offer_text, num_offers, content_mode, game_context=game_context
+    )
+    query_vec = await semantic_outline_cache.embed(f"{keyword}|{title}|{brand}")
+    similar = await semantic_outline_cache.search(query_vec, semantic_scope)
+    if similar is not None:
+        await outline_cache.store(cache_key, similar)
+        return similar
+
+    # Get RAG context
+    rag_snippets = await query_articles(keyword, k=OUTLINE_RAG_K, snippet_chars=OUTLINE_RAG_SNIPPET_CHARS)
+    rag_context = "\n\n".join([
+        f"[{s['source']}]: {s['snippet']}"
+        for s in rag_snippets
+    ]) or "(No relevant articles found)"
+    section_titles = _contextual_section_titles(
+        keyword,
+        brand,
+        game_context,
+        is_prediction_market=is_prediction_market,
+        is_dfs=is_dfs,
+    )
+
+    system_prompt, user_prompt, shortcode_token = _build_outline_prompt(
+        keyword,
+        title,
+        brand=brand,
+        offer_text=offer_text,
+        num_offers=num_offers,
+        section_titles=section_titles,
+        is_prediction_market=is_prediction_market,
+        is_dfs=is_dfs,
+        game_context=game_context,
+    )
 
     # Generate
     response = await generate_completion(
         prompt=user_prompt,
         system_prompt=system_prompt,
-        temperature=0.3,
-        max_tokens=1000,
+        temperature=LEGACY_OUTLINE_TEMPERATURE,
+        max_tokens=LEGACY_OUTLINE_MAX_TOKENS,
     )
 
     # Parse tokens
-    shortcode_token = "[SHORTCODE_MAIN]" if num_offers > 1 else "[SHORTCODE]"
     tokens = parse_outline_tokens(response, default_shortcode_token=shortcode_token)
-    return tokens if tokens else _default_tokens_multi(num_offers=num_offers, keyword=keyword or "Offer")
+    if not tokens:
+        return _default_tokens_multi(num_offers=num_offers, keyword=keyword or "Offer")
+    if response.strip():
+        await outline_cache.store(cache_key, tokens)
+        await semantic_outline_cache.add(query_vec, semantic_scope, tokens)
+    return tokens
 
 
 async def generate_outline_streaming(
@@ -1688,19 +2172,59 @@ async def generate_outline_streaming(
 ) -> AsyncGenerator[dict, None]:
     """Generate outline with streaming updates (legacy format).
 
-    Yields dicts: {type: 'status'|'token'|'done', ...}
+    Yields dicts: {type: 'status'|'tokens'|'done', ...}. Matched tokens are
+    batched into ``tokens`` frames (a list of token strings) flushed every
+    OUTLINE_STREAM_BATCH_SIZE tokens or OUTLINE_STREAM_FLUSH_SECONDS. Cached
+    outlines are replayed as a single ``tokens`` frame without an LLM call.
     """
+    content_mode = get_content_mode_context(keyword, title, brand, offer_text)
+    is_prediction_market = content_mode == CONTENT_MODE_PREDICTION_MARKET
+    is_dfs = content_mode == CONTENT_MODE_DFS
+    cache_key = outline_cache_key(
+        variant="outline_streaming",
+        prompt_version=LEGACY_OUTLINE_PROMPT_VERSION,
+        keyword=keyword.strip(),
+        title=title.strip(),
+        brand=brand.strip(),
+        offer_text=offer_text,
+        state=state,
+        competitor_context=competitor_context,
+        style_profile=style_profile,
+        num_offers=num_offers,
+        content_mode=content_mode,
+        temperature=LEGACY_OUTLINE_TEMPERATURE,
+        max_tokens=LEGACY_OUTLINE_MAX_TOKENS,
+    )
+    cached = await outline_cache.lookup(cache_key)
+    if cached is None:
+        semantic_scope = _semantic_outline_scope(
+            "outline_streaming",
+            brand,
+            offer_text,
+            num_offers,
+            content_mode,
+            state=state,
+            competitor_context=competitor_context,
+            style_profile=style_profile,
+        )
+        query_vec = await semantic_outline_cache.embed(f"{keyword}|{title}|{brand}")
+        cached = await semantic_outline_cache.search(query_vec, semantic_scope)
+        if cached is not None:
+            await outline_cache.store(cache_key, cached)
+    if cached is not None:
+        yield {"type": "status", "message": "Using cached outline"}
+        yield {"type": "tokens", "content": cached}
+        yield {"type": "done", "outline": cached}
+        return
+
     yield {"type": "status", "message": "Querying article database..."}
 
     # Get RAG context
-    rag_snippets = await query_articles(keyword, k=6, snippet_chars=800)
+    rag_snippets = await query_articles(keyword, k=OUTLINE_RAG_K, snippet_chars=OUTLINE_RAG_SNIPPET_CHARS)
     rag_context = "\n\n".join([
         f"[{s['source']}]: {s['snippet']}"
         for s in rag_snippets
     ]) or "(No relevant articles found)"
-    content_mode = get_content_mode_context(keyword, title, brand, offer_text)
-    is_prediction_market = content_mode == CONTENT_MODE_PREDICTION_MARKET
-    is_dfs = content_mode == CONTENT_MODE_DFS
     section_titles = _contextual_section_titles(
         keyword,
         brand,
@@ -1710,97 +2234,75 @@ async def generate_outline_streaming(
 
     yield {"type": "status", "message": f"Found {len(rag_snippets)} relevant articles"}
 
-    # Build prompt (same as non-streaming)
-    publication_label = (
-        "prediction-market"
-        if is_prediction_market
-        else "DFS"
-        if is_dfs
-        else "sports betting"
-    )
-    language_rule = (
-        "Avoid sportsbook/betting terminology for this operator"
-        if is_prediction_market or is_dfs
-        else "Use natural sportsbook terminology"
+    system_prompt, user_prompt, _ = _build_outline_prompt(
+        keyword,
+        title,
+        brand=brand,
+        offer_text=offer_text,
+        num_offers=num_offers,
+        section_titles=section_titles,
+        is_prediction_market=is_prediction_market,
+        is_dfs=is_dfs,
+        streaming=True,
+        rag_context=rag_context,
+        state=state,
+        style_profile=style_profile,
+        competitor_context=competitor_context,
     )
-    system_prompt = f"""You are an SEO content planner specializing in {publication_label} promotional content.
-Your task is to create a structured article outline using bracket tokens.
-
-Output format (one token per line):
-[INTRO] - Opening paragraph hook
-[SHORTCODE] - Promo module placement (or [SHORTCODE_MAIN]/[SHORTCODE_1]/[SHORTCODE_2])
-[H2: Section Title] - Main sections
-[H3: Subsection Title] - Subsections under H2s
-
-Rules:
-- Start with [INTRO] then [SHORTCODE]
-- Use 4-5 H2 sections
-- Use H3 subsections sparingly (0-3 per H2)
-- Keep titles concise, contextual, and keyword-relevant
-- Include a Daily Promos section placeholder
-- Output ONLY the tokens, no explanations
-- {language_rule}"""
-
-    user_prompt = f"""Create an article outline for:
-
-KEYWORD: {keyword}
-TITLE: {title}
-BRAND: {brand or "(none)"}
-OFFER: {offer_text or "(none)"}
-STATE: {state}
-STYLE: {style_profile}
-
-REQUIRED STRUCTURE (follow this pattern):
-[INTRO]
-[SHORTCODE_MAIN]
-[H2: {section_titles['overview']}]
-[H2: {section_titles['claim']}]
-[SHORTCODE_MAIN]
-[H2: {section_titles['daily_promos']}]
-[H2: {section_titles['signup']}]
-[H2: {section_titles['terms']}]
-
-STRUCTURE EXAMPLES (use for outline format inspiration, NOT content):
-These show how we typically structure similar articles.
-{rag_context}
-
-{f"COMPETITOR CONTEXT:{chr(10)}{competitor_context}" if competitor_context else ""}
-
-You have {num_offers} total offer(s). If more than 1, include [SHORTCODE_1] and [SHORTCODE_2] tokens.
-
-Generate the outline tokens now:"""
 
     yield {"type": "status", "message": "Generating outline..."}
 
-    # Stream the response
-    buffer = ""
+    # Stream the response; only the trailing partial line is carried over, as
+    # a list of chunks so a long newline-free run is joined once, not per chunk
+    tail_parts: list[str] = []
     tokens_found = []
+    pending: list[str] = []
+    last_flush = time.monotonic()
 
     async for chunk in generate_completion_streaming(
         prompt=user_prompt,
         system_prompt=system_prompt,
-        temperature=0.3,
-        max_tokens=1000,
+        temperature=LEGACY_OUTLINE_TEMPERATURE,
+        max_tokens=LEGACY_OUTLINE_MAX_TOKENS,
     ):
-        buffer += chunk
+        last_newline = chunk.rfind("\n")
+        if last_newline == -1:
+            tail_parts.append(chunk)
+        else:
+            if tail_parts:
+                last_newline += sum(map(len, tail_parts))
+                tail_parts.append(chunk)
+                text = "".join(tail_parts)
+            else:
+                text = chunk
+            tail_parts = [text[last_newline + 1:]]
+            # Pull every token line out of the complete-lines region in one scan
+            for match in _STREAM_TOKEN_RE.finditer(text, 0, last_newline):
+                line = match.group(1)
+                tokens_found.append(line)
+                pending.append(line)
 
-        # Check for complete lines
-        while "\n" in buffer:
-            line, buffer = buffer.split("\n", 1)
-            line = line.strip()
+        if pending and (
+            len(pending) >= OUTLINE_STREAM_BATCH_SIZE
+            or time.monotonic() - last_flush > OUTLINE_STREAM_FLUSH_SECONDS
+        ):
+            yield {"type": "tokens", "content": pending}
+            pending = []
+            last_flush = time.monotonic()
 
-            if line and re.match(r"^\[(?:INTRO|SHORTCODE(?:_[A-Z0-9]+)?|H[23]:\s*.+)\]$", line, re.IGNORECASE):
-                tokens_found.append(line)
-                yield {"type": "token", "content": line}
+    # Check remaining partial line
+    line = "".join(tail_parts).strip()
+    if line and _is_token_line(line):
+        tokens_found.append(line)
+        pending.append(line)
 
-    # Check remaining buffer
-    if buffer.strip():
-        line = buffer.strip()
-        if re.match(r"^\[(?:INTRO|SHORTCODE(?:_[A-Z0-9]+)?|H[23]:\s*.+)\]$", line, re.IGNORECASE):
-            tokens_found.append(line)
-            yield {"type": "token", "content": line}
+    if pending:
+        yield {"type": "tokens", "content": pending}
 
     # Use defaults if nothing found
     final_tokens = tokens_found if tokens_found else _default_tokens_multi(num_offers=num_offers, keyword=keyword or "Offer")
     final_tokens = _reposition_alt_shortcodes(final_tokens)
+    if tokens_found:
+        await outline_cache.store(cache_key, final_tokens)
+        await semantic_outline_cache.add(query_vec, semantic_scope, final_tokens)
     yield {"type": "done", "outline": final_tokens}
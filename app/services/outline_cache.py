@@ -0,0 +1,322 @@
+"""Caches for legacy token outlines.
+
+Identical outline requests (same normalized inputs, sampling params and
+prompt version) skip the RAG lookup and LLM round trip. Entries live in an
+in-memory TTL map in front of a small SQLite table under
+``storage/outline_cache`` so they survive restarts. Request handlers use the
+async ``lookup``/``store`` pair, which run the SQLite calls on a worker thread.
+
+Near-duplicate requests ("DraftKings promo code" vs "DraftKings promo") are
+served by SemanticOutlineCache, a FAISS cosine lookup over keyword/title
+embeddings persisted under ``storage/outline_semcache``.
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import orjson
+
+try:
+    import faiss
+except ImportError:  # pragma: no cover - faiss-cpu is a declared dependency
+    faiss = None
+
+from app.config import get_settings
+from app.services.llm import get_embedding
+
+settings = get_settings()
+
+OUTLINE_CACHE_TTL_SECONDS = 60 * 60
+OUTLINE_CACHE_MAX_KEYS = 256
+
+
+def outline_cache_key(**parts: Any) -> str:
+    """Hash the prompt-shaping inputs of a token outline request."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class OutlineCache:
+    """In-memory outline cache with optional SQLite persistence."""
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        ttl_seconds: int = OUTLINE_CACHE_TTL_SECONDS,
+        max_keys: int = OUTLINE_CACHE_MAX_KEYS,
+    ) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_keys = max_keys
+        self._memory: dict[str, tuple[float, list[str]]] = {}
+        self._conn: sqlite3.Connection | None = None
+        # Serializes SQLite access from worker threads
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection | None:
+        if self._conn is not None or self.path is None:
+            return self._conn
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS outline_cache "
+                "(key TEXT PRIMARY KEY, expires_at REAL NOT NULL, tokens TEXT NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        except Exception as e:
+            print(f"Failed to open outline cache: {e}")
+            self.path = None
+        return self._conn
+
+    def _remember(self, key: str, expires_at: float, tokens: list[str]) -> None:
+        if key not in self._memory and len(self._memory) >= self.max_keys:
+            oldest = min(self._memory.items(), key=lambda item: item[1][0])[0]
+            self._memory.pop(oldest, None)
+        self._memory[key] = (expires_at, list(tokens))
+
+    def _memory_get(self, key: str, now: float) -> list[str] | None:
+        cached = self._memory.get(key)
+        if cached:
+            expires_at, tokens = cached
+            if expires_at >= now:
+                return list(tokens)
+            self._memory.pop(key, None)
+        return None
+
+    def _load(self, key: str, now: float) -> tuple[float, list[str]] | None:
+        with self._lock:
+            conn = self._db()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    "SELECT expires_at, tokens FROM outline_cache WHERE key = ?", (key,)
+                ).fetchone()
+            except Exception:
+                return None
+        if not row or row[0] < now:
+            return None
+        return row[0], json.loads(row[1])
+
+    def _persist(self, key: str, expires_at: float, tokens: list[str]) -> None:
+        with self._lock:
+            conn = self._db()
+            if conn is None:
+                return
+            try:
+                conn.execute("DELETE FROM outline_cache WHERE expires_at < ?", (time.time(),))
+                conn.execute(
+                    "INSERT OR REPLACE INTO outline_cache (key, expires_at, tokens) VALUES (?, ?, ?)",
+                    (key, expires_at, json.dumps(tokens, ensure_ascii=False)),
+                )
+                conn.commit()
+            except Exception as e:
+                print(f"Failed to save outline cache: {e}")
+
+    def get(self, key: str) -> list[str] | None:
+        """Return a copy of the cached tokens for ``key``, or None."""
+        now = time.time()
+        tokens = self._memory_get(key, now)
+        if tokens is not None:
+            return tokens
+        loaded = self._load(key, now)
+        if loaded is None:
+            return None
+        self._remember(key, *loaded)
+        return list(loaded[1])
+
+    def set(self, key: str, tokens: list[str]) -> None:
+        """Cache ``tokens`` under ``key`` for ``ttl_seconds``."""
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, expires_at, tokens)
+        self._persist(key, expires_at, list(tokens))
+
+    async def lookup(self, key: str) -> list[str] | None:
+        """Async ``get``: memory hits return inline, disk reads run in a thread."""
+        now = time.time()
+        tokens = self._memory_get(key, now)
+        if tokens is not None or self.path is None:
+            return tokens
+        loaded = await asyncio.to_thread(self._load, key, now)
+        if loaded is None:
+            return None
+        self._remember(key, *loaded)
+        return list(loaded[1])
+
+    async def store(self, key: str, tokens: list[str]) -> None:
+        """Async ``set``: the SQLite write runs in a thread."""
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, expires_at, tokens)
+        if self.path is not None:
+            await asyncio.to_thread(self._persist, key, expires_at, list(tokens))
+
+    def clear(self) -> None:
+        """Drop all cached outlines (memory and disk)."""
+        self._memory.clear()
+        with self._lock:
+            conn = self._db()
+            if conn is None:
+                return
+            try:
+                conn.execute("DELETE FROM outline_cache")
+                conn.commit()
+            except Exception:
+                pass
+
+
+def _require_faiss() -> None:
+    if faiss is None:
+        raise RuntimeError("faiss is required for the outline semantic cache (install faiss-cpu)")
+
+
+class SemanticOutlineCache:
+    """Reuse outlines for near-duplicate requests via FAISS cosine lookup.
+
+    Only entries whose ``scope`` (every exact-cache input except the embedded
+    keyword/title text) matches exactly are eligible, so similarity never
+    crosses operators, game/state context or shortcode layouts. Entries expire
+    after ``ttl_seconds``; when ``max_entries`` is reached, expired and then
+    oldest entries are evicted. FAISS and file work run on a worker thread.
+    """
+
+    def __init__(
+        self,
+        directory: Path | None = None,
+        threshold: float = 0.92,
+        enabled: bool = True,
+        max_entries: int = 5000,
+        search_k: int = 8,
+        ttl_seconds: int = OUTLINE_CACHE_TTL_SECONDS,
+    ) -> None:
+        self.directory = directory
+        self.threshold = threshold
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.search_k = search_k
+        self.ttl_seconds = ttl_seconds
+        self._index = None
+        self._entries: list[dict] = []
+        self._loaded = False
+        # Serializes index and file access from worker threads
+        self._lock = threading.Lock()
+        if enabled:
+            _require_faiss()
+
+    @property
+    def _index_file(self) -> Path | None:
+        return self.directory / "index.faiss" if self.directory else None
+
+    @property
+    def _entries_file(self) -> Path | None:
+        return self.directory / "entries.jsonl" if self.directory else None
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        index_file, entries_file = self._index_file, self._entries_file
+        if not index_file or not index_file.exists() or not entries_file.exists():
+            return
+        try:
+            index = faiss.read_index(str(index_file))
+            with open(entries_file, encoding="utf-8") as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+            if index.ntotal == len(entries):
+                self._index, self._entries = index, entries
+        except Exception as e:
+            print(f"Failed to load outline semantic cache: {e}")
+
+    async def embed(self, text: str) -> np.ndarray | None:
+        """Return a normalized (1, dim) query vector, or None when disabled/failed."""
+        if not self.enabled:
+            return None
+        try:
+            vec = np.array([await get_embedding(text)], dtype=np.float32)
+        except Exception as e:
+            print(f"Outline semantic cache embedding failed: {e}")
+            return None
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else None
+
+    async def search(self, vec: np.ndarray | None, scope: dict[str, Any]) -> list[str] | None:
+        """Return tokens of the closest live in-scope entry at or above threshold."""
+        if vec is None:
+            return None
+        return await asyncio.to_thread(self._search, vec, outline_cache_key(**scope))
+
+    def _search(self, vec: np.ndarray, scope_key: str) -> list[str] | None:
+        with self._lock:
+            self._ensure_loaded()
+            if self._index is None or not self._entries or self._index.d != vec.shape[1]:
+                return None
+            now = time.time()
+            scores, ids = self._index.search(vec, min(self.search_k, len(self._entries)))
+            for score, idx in zip(scores[0], ids[0]):
+                if idx < 0 or score < self.threshold:
+                    break
+                entry = self._entries[idx]
+                if entry["scope"] == scope_key and entry.get("expires_at", 0) >= now:
+                    return list(entry["tokens"])
+        return None
+
+    async def add(self, vec: np.ndarray | None, scope: dict[str, Any], tokens: list[str]) -> None:
+        """Remember ``tokens`` for ``vec``, evicting expired/oldest entries when full."""
+        if vec is None:
+            return
+        await asyncio.to_thread(self._add, vec, outline_cache_key(**scope), list(tokens))
+
+    def _add(self, vec: np.ndarray, scope_key: str, tokens: list[str]) -> None:
+        with self._lock:
+            self._ensure_loaded()
+            try:
+                if self._index is None:
+                    self._index = faiss.IndexFlatIP(vec.shape[1])
+                elif self._index.d != vec.shape[1]:
+                    return
+                now = time.time()
+                evicted = len(self._entries) >= self.max_entries
+                if evicted:
+                    self._evict(now)
+                entry = {"scope": scope_key, "tokens": tokens, "expires_at": now + self.ttl_seconds}
+                self._index.add(vec)
+                self._entries.append(entry)
+                if self.directory:
+                    self.directory.mkdir(parents=True, exist_ok=True)
+                    # Eviction renumbers the index, so the entries file is rewritten
+                    with open(self._entries_file, "wb" if evicted else "ab") as f:
+                        for row in self._entries if evicted else [entry]:
+                            f.write(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE))
+                    faiss.write_index(self._index, str(self._index_file))
+            except Exception as e:
+                print(f"Failed to save outline semantic cache: {e}")
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then the oldest, to make room for one more."""
+        keep = [i for i, entry in enumerate(self._entries) if entry.get("expires_at", 0) >= now]
+        # Entries are appended in insertion (= expiry) order, so oldest come first
+        overflow = len(keep) - (self.max_entries - 1)
+        if overflow > 0:
+            keep = keep[overflow:]
+        vectors = self._index.reconstruct_n(0, self._index.ntotal)
+        index = faiss.IndexFlatIP(self._index.d)
+        if keep:
+            index.add(vectors[keep])
+        self._index = index
+        self._entries = [self._entries[i] for i in keep]
+
+
+outline_cache = OutlineCache(settings.storage_dir / "outline_cache" / "outlines.sqlite3")
+semantic_outline_cache = SemanticOutlineCache(
+    settings.storage_dir / "outline_semcache",
+    threshold=settings.outline_semantic_cache_threshold,
+    enabled=settings.outline_semantic_cache_enabled,
+)
@@ -3,15 +3,26 @@
 Upgraded from v1's NumPy memmap to FAISS for faster search.
 """
 
+import asyncio
 import json
 import re
+import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Optional
 
 import numpy as np
+import orjson
+
+try:
+    import faiss
+except ImportError:  # pragma: no cover - faiss-cpu is a declared dependency
+    faiss = None
 
 from app.config import get_settings
-from app.services.llm import get_embedding, get_embeddings_batch
+from app.services.io_utils import write_jsonl
+from app.services.llm import get_embeddings_batch
+from app.services.text_utils import strip_front_matter
 
 settings = get_settings()
 
@@ -24,11 +35,115 @@ FAISS_DIR = STORAGE_DIR / "faiss_index"
 LEGACY_INDEX_BIN = DATA_DIR / "articles_index.bin"
 LEGACY_INDEX_META = DATA_DIR / "articles_meta.jsonl"
 LEGACY_INDEX_SHAPE = DATA_DIR / "articles_index.shape.json"
+LEGACY_ADD_BATCH_SIZE = 10_000
 
 # FAISS index files
 FAISS_INDEX_FILE = FAISS_DIR / "index.faiss"
 FAISS_META_FILE = FAISS_DIR / "metadata.jsonl"
 
+# query_articles results are cached briefly so outline/draft regenerations
+# for the same keyword skip the embedding call and vector search.
+QUERY_CACHE_TTL_SECONDS = 5 * 60
+QUERY_CACHE_MAX_KEYS = 256
+
+_QUERY_CACHE: dict[tuple[str, int, int], tuple[float, list[dict]]] = {}
+_QUERY_INFLIGHT: dict[tuple[str, int, int], asyncio.Future] = {}
+
+# Normalized query embeddings, LRU-evicted. Embeddings are deterministic, so
+# entries never expire; search() reuses them across regenerations and retries.
+EMBEDDING_CACHE_MAX_KEYS = 4096
+
+_EMB_CACHE: OrderedDict[str, np.ndarray] = OrderedDict()
+
+
+# Concurrent RAG searches (e.g. campaign batch runs) are coalesced into one
+# embeddings request per window.
+EMBED_BATCH_WINDOW_SECONDS = 0.01
+EMBED_BATCH_MAX_SIZE = 64
+
+
+class BatchingEmbedder:
+    """Coalesce concurrent single-text embeddings into batched API calls.
+
+    Callers awaiting ``embed`` within EMBED_BATCH_WINDOW_SECONDS of each other
+    share one get_embeddings_batch request (identical texts are sent once).
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = EMBED_BATCH_WINDOW_SECONDS,
+        max_batch: int = EMBED_BATCH_MAX_SIZE,
+    ):
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def embed(self, text: str) -> list[float]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    async def _run(batch: list[tuple[str, asyncio.Future]]) -> None:
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            vectors = dict(zip(texts, await get_embeddings_batch(texts)))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for text, future in batch:
+            if not future.done():
+                future.set_result(vectors[text])
+
+
+_batched_embedder = BatchingEmbedder()
+
+
+async def _embed_query(query: str) -> np.ndarray:
+    """Return the normalized (1, dim) float32 embedding for ``query``."""
+    key = query.strip().lower()
+    cached = _EMB_CACHE.get(key)
+    if cached is not None:
+        _EMB_CACHE.move_to_end(key)
+        return cached
+
+    query_arr = np.asarray(await _batched_embedder.embed(query), dtype=np.float32).reshape(1, -1)
+    faiss.normalize_L2(query_arr)
+
+    _EMB_CACHE[key] = query_arr
+    if len(_EMB_CACHE) > EMBEDDING_CACHE_MAX_KEYS:
+        _EMB_CACHE.popitem(last=False)
+    return query_arr
+
+
+def _require_faiss() -> None:
+    if faiss is None:
+        raise RuntimeError("faiss is required for RAG search (install faiss-cpu)")
+
+
+def _read_jsonl(path: Path) -> list[dict]:
+    """Read a JSON-lines file in one pass, skipping blank lines."""
+    return [orjson.loads(line) for line in path.read_bytes().splitlines() if line.strip()]
+
 
 class RAGStore:
     """Vector store for article retrieval."""
@@ -56,14 +171,9 @@ class RAGStore:
     def _load_faiss(self) -> bool:
         """Load FAISS index."""
         try:
-            import faiss
-
+            _require_faiss()
             self._index = faiss.read_index(str(FAISS_INDEX_FILE))
-            self._metadata = []
-            with open(FAISS_META_FILE, "r", encoding="utf-8") as f:
-                for line in f:
-                    if line.strip():
-                        self._metadata.append(json.loads(line))
+            self._metadata = _read_jsonl(FAISS_META_FILE)
             self._loaded = True
             return True
         except Exception as e:
@@ -86,17 +196,22 @@ class RAGStore:
             )
 
             # Load metadata
-            self._metadata = []
-            with open(LEGACY_INDEX_META, "r", encoding="utf-8") as f:
-                for line in f:
-                    if line.strip():
-                        self._metadata.append(json.loads(line))
-
-            # Create FAISS index from legacy data
-            import faiss
+            self._metadata = _read_jsonl(LEGACY_INDEX_META)
 
+            # Create FAISS index from legacy data, adding memmap slices so the
+            # whole corpus is never copied into RAM at once
+            _require_faiss()
             self._index = faiss.IndexFlatIP(dim)  # Inner product (cosine for normalized)
-            self._index.add(np.array(vectors))
+            for start in range(0, total, LEGACY_ADD_BATCH_SIZE):
+                self._index.add(np.ascontiguousarray(vectors[start:start + LEGACY_ADD_BATCH_SIZE]))
+
+            # Persist the converted index so later loads skip the legacy path
+            try:
+                FAISS_DIR.mkdir(parents=True, exist_ok=True)
+                faiss.write_index(self._index, str(FAISS_INDEX_FILE))
+                write_jsonl(FAISS_META_FILE, self._metadata)
+            except Exception as e:
+                print(f"Failed to persist converted FAISS index: {e}")
 
             self._loaded = True
             return True
@@ -120,17 +235,12 @@ class RAGStore:
         if self._index is None or not self._metadata:
             return []
 
-        # Get query embedding
-        query_vec = await get_embedding(query)
-        query_arr = np.array([query_vec], dtype=np.float32)
-
-        # Normalize for cosine similarity
-        norm = np.linalg.norm(query_arr)
-        if norm > 0:
-            query_arr = query_arr / norm
+        # Get normalized query embedding (cached per query string)
+        query_arr = await _embed_query(query)
 
         # Search
-        scores, indices = self._index.search(query_arr, top_k)
+        # Off the event loop: the scan is CPU-bound and releases the GIL
+        scores, indices = await asyncio.to_thread(self._index.search, query_arr, top_k)
 
         results = []
         for score, idx in zip(scores[0], indices[0]):
@@ -161,40 +271,37 @@ class RAGStore:
         Compatibility layer matching v1's query_articles function.
         """
         hits = await self.search(query, top_k=k)
-        results = []
 
-        for hit in hits:
-            snippet = hit.get("preview", "")
-
-            # Extend snippet if needed
-            if snippet_chars > len(snippet) and hit.get("path"):
-                try:
-                    path = Path(hit["path"])
-                    if path.exists():
-                        raw = path.read_text(encoding="utf-8", errors="ignore")
-                        body = self._strip_front_matter(raw)
-                        body = re.sub(r"\s+", " ", body).strip()
-                        snippet = body[:snippet_chars]
-                except Exception:
-                    pass
+        # Extend short previews from disk on worker threads, all hits at once
+        snippets = await asyncio.gather(*[
+            asyncio.to_thread(self._extended_snippet, hit, snippet_chars) for hit in hits
+        ])
 
-            results.append({
+        return [
+            {
                 "score": hit["score"],
                 "path": hit["path"],
                 "snippet": snippet,
                 "source": hit["source"],
-            })
-
-        return results
+            }
+            for hit, snippet in zip(hits, snippets)
+        ]
 
     @staticmethod
-    def _strip_front_matter(text: str) -> str:
-        """Remove YAML front matter from markdown."""
-        if text.startswith("---"):
-            end = text.find("\n---", 3)
-            if end != -1:
-                return text[end + 4:]
-        return text
+    def _extended_snippet(hit: dict, snippet_chars: int) -> str:
+        """Return the hit preview, extended from the source file if too short."""
+        snippet = hit.get("preview", "")
+        if snippet_chars > len(snippet) and hit.get("path"):
+            try:
+                path = Path(hit["path"])
+                if path.exists():
+                    raw = path.read_text(encoding="utf-8", errors="ignore")
+                    body = strip_front_matter(raw)
+                    body = re.sub(r"\s+", " ", body).strip()
+                    snippet = body[:snippet_chars]
+            except Exception:
+                pass
+        return snippet
 
 
 # Global instance
@@ -215,7 +322,53 @@ async def search_articles(query: str, top_k: int = 8) -> list[dict]:
     return await store.search(query, top_k=top_k)
 
 
+def _query_cache_key(query: str, k: int, snippet_chars: int) -> tuple[str, int, int]:
+    return (re.sub(r"\s+", " ", (query or "").strip().lower()), k, snippet_chars)
+
+
+def _get_cached_query(key: tuple[str, int, int]) -> list[dict] | None:
+    cached = _QUERY_CACHE.get(key)
+    if not cached:
+        return None
+    expires_at, hits = cached
+    if expires_at < time.time():
+        _QUERY_CACHE.pop(key, None)
+        return None
+    return [dict(hit) for hit in hits]
+
+
+def _set_cached_query(key: tuple[str, int, int], hits: list[dict]) -> None:
+    if len(_QUERY_CACHE) >= QUERY_CACHE_MAX_KEYS:
+        oldest = min(_QUERY_CACHE.items(), key=lambda item: item[1][0])[0]
+        _QUERY_CACHE.pop(oldest, None)
+    _QUERY_CACHE[key] = (time.time() + QUERY_CACHE_TTL_SECONDS, [dict(hit) for hit in hits])
+
+
 async def query_articles(query: str, k: int = 5, snippet_chars: int = 500) -> list[dict]:
-    """Convenience function matching v1 API."""
+    """Convenience function matching v1 API.
+
+    Results are cached per normalized query for QUERY_CACHE_TTL_SECONDS.
+    Concurrent callers for the same key share a single search.
+    """
+    key = _query_cache_key(query, k, snippet_chars)
+    cached = _get_cached_query(key)
+    if cached is not None:
+        return cached
+
+    # The in-flight search is keyed until it finishes, so every caller that
+    # arrives meanwhile awaits the same task; shield() keeps one caller's
+    # cancellation from cancelling it for the others.
+    task = _QUERY_INFLIGHT.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_search_and_cache(key, query, k, snippet_chars))
+        _QUERY_INFLIGHT[key] = task
+        task.add_done_callback(lambda _: _QUERY_INFLIGHT.pop(key, None))
+    hits = await asyncio.shield(task)
+    return [dict(hit) for hit in hits]
+
+
+async def _search_and_cache(key: tuple[str, int, int], query: str, k: int, snippet_chars: int) -> list[dict]:
     store = get_rag_store()
-    return await store.query_articles(query, k=k, snippet_chars=snippet_chars)
+    hits = await store.query_articles(query, k=k, snippet_chars=snippet_chars)
+    _set_cached_query(key, hits)
+    return hits
@@ -2,35 +2,63 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections import deque
 from pathlib import Path
-import json
 
 import numpy as np
 
+try:
+    import faiss
+except ImportError:  # pragma: no cover - faiss-cpu is a declared dependency
+    faiss = None
+
 from app.config import get_settings
+from app.services.io_utils import write_jsonl
 from app.services.llm import get_embeddings_batch
-
-
-def _strip_front_matter(text: str) -> str:
-    if text.startswith("---"):
-        end = text.find("\n---", 3)
-        if end != -1:
-            return text[end + 4:]
-    return text
+from app.services.text_utils import strip_front_matter
 
 
 def _chunk_text(text: str, chunk_size: int = 1000, overlap: int = 100) -> list[tuple[int, str]]:
     text = text.strip()
     if not text:
         return []
+    # Callers collapse whitespace first, so chunk length needs no strip().
     step = max(1, chunk_size - overlap)
-    chunks: list[tuple[int, str]] = []
-    for start in range(0, len(text), step):
-        chunk = text[start:start + chunk_size]
-        if len(chunk.strip()) < 200:
-            continue
-        chunks.append((start, chunk))
-    return chunks
+    chunks = [(start, text[start:start + chunk_size]) for start in range(0, len(text), step)]
+    return [(start, chunk) for start, chunk in chunks if len(chunk) >= 200]
+
+
+# Corpora up to this size get an exact (brute-force) scan; larger ones get an
+# HNSW graph index so search stays sub-linear as the article corpus grows.
+# Both store vectors as 8-bit scalar-quantized codes (4x smaller than FP32).
+HNSW_MIN_VECTORS = 20_000
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+# Article files are read on worker threads, at most this many ahead of the
+# chunk/embed consumer, so disk reads overlap with pending embedding requests
+# without holding the whole corpus in memory.
+READ_CONCURRENCY = 32
+
+
+def _make_faiss_index(vectors_arr: np.ndarray):
+    """Build an inner-product FAISS index over normalized ``vectors_arr``."""
+    if faiss is None:
+        raise RuntimeError("faiss is required to build the RAG index (install faiss-cpu)")
+
+    dim = vectors_arr.shape[1]
+    qtype = faiss.ScalarQuantizer.QT_8bit
+    if len(vectors_arr) < HNSW_MIN_VECTORS:
+        index = faiss.IndexScalarQuantizer(dim, qtype, faiss.METRIC_INNER_PRODUCT)
+    else:
+        index = faiss.IndexHNSWSQ(dim, qtype, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+    index.train(vectors_arr)
+    index.add(vectors_arr)
+    return index
 
 
 async def build_rag_index(
@@ -71,46 +99,66 @@ async def build_rag_index(
         vectors.extend(embeds)
         docs = []
 
-    for path in files:
+    def _read(path: Path) -> str | None:
         try:
-            raw = path.read_text(encoding="utf-8", errors="ignore")
+            return path.read_text(encoding="utf-8", errors="ignore")
         except Exception:
-            continue
-
-        body = _strip_front_matter(raw)
-        body = " ".join(body.split())
-
-        for start, chunk in _chunk_text(body, chunk_size=chunk_size, overlap=overlap):
-            try:
-                rel_path = str(path.relative_to(settings.base_dir))
-            except ValueError:
-                rel_path = str(path)
-            docs.append(chunk)
-            meta.append({
-                "path": rel_path,
-                "start": start,
-                "preview": chunk[:300],
-            })
-            if len(docs) >= batch_size:
-                await _flush_batch()
+            return None
+
+    # Reads run concurrently in a bounded look-ahead window; results are
+    # consumed in file order so chunk ids stay deterministic across rebuilds.
+    remaining = iter(files)
+    reads: deque[tuple[Path, asyncio.Future]] = deque()
+
+    def _fill_window() -> None:
+        while len(reads) < READ_CONCURRENCY:
+            path = next(remaining, None)
+            if path is None:
+                return
+            reads.append((path, asyncio.ensure_future(asyncio.to_thread(_read, path))))
+
+    _fill_window()
+    try:
+        while reads:
+            path, read = reads.popleft()
+            raw = await read
+            _fill_window()
+            if raw is None:
+                continue
+
+            body = strip_front_matter(raw)
+            body = " ".join(body.split())
+
+            for start, chunk in _chunk_text(body, chunk_size=chunk_size, overlap=overlap):
+                try:
+                    rel_path = str(path.relative_to(settings.base_dir))
+                except ValueError:
+                    rel_path = str(path)
+                docs.append(chunk)
+                meta.append({
+                    "path": rel_path,
+                    "start": start,
+                    "preview": chunk[:300],
+                })
+                if len(docs) >= batch_size:
+                    await _flush_batch()
+    finally:
+        # An embedding failure leaves reads in flight; don't leave them pending
+        for _, read in reads:
+            read.cancel()
 
     await _flush_batch()
 
     if not vectors:
         return 0
 
-    import faiss  # local import to avoid optional dependency errors at startup
-
     vectors_arr = np.array(vectors, dtype=np.float32)
     norms = np.linalg.norm(vectors_arr, axis=1, keepdims=True)
     vectors_arr = vectors_arr / (norms + 1e-12)
 
-    index = faiss.IndexFlatIP(vectors_arr.shape[1])
-    index.add(vectors_arr)
+    index = _make_faiss_index(vectors_arr)
     faiss.write_index(index, str(index_path))
 
-    with open(meta_path, "w", encoding="utf-8") as f:
-        for record in meta:
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    write_jsonl(meta_path, meta)
 
     return len(meta)
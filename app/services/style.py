@@ -4,6 +4,8 @@ Provides style profiles and constraints for content generation.
 The RAG layer provides writing STYLE examples, not factual content.
 """
 
+from collections.abc import Mapping
+from types import MappingProxyType
 from typing import Any
 
 # Style profile definitions
@@ -79,17 +81,24 @@ STYLE_PROFILES = {
     },
 }
 
+# Profiles are shared read-only: callers cannot mutate them, and the
+# formatted prompt text is built once per profile name.
+STYLE_PROFILES = {
+    name: MappingProxyType({**profile, "avoid": tuple(profile["avoid"]), "include": tuple(profile["include"])})
+    for name, profile in STYLE_PROFILES.items()
+}
+
 DEFAULT_PROFILE = "Top Stories – Informative"
 
 
-def get_style_constraints(profile_name: str = DEFAULT_PROFILE) -> dict[str, Any]:
+def get_style_constraints(profile_name: str = DEFAULT_PROFILE) -> Mapping[str, Any]:
     """Get style constraints for a given profile.
 
     Args:
         profile_name: Name of the style profile
 
     Returns:
-        Dict of style constraints including reading level, tone, etc.
+        Read-only mapping of style constraints including reading level, tone, etc.
     """
     profile = STYLE_PROFILES.get(profile_name, STYLE_PROFILES[DEFAULT_PROFILE])
     return profile
@@ -100,17 +109,7 @@ def get_available_profiles() -> list[str]:
     return list(STYLE_PROFILES.keys())
 
 
-def format_constraints_for_prompt(profile_name: str = DEFAULT_PROFILE) -> str:
-    """Format style constraints as text for inclusion in prompts.
-
-    Args:
-        profile_name: Name of the style profile
-
-    Returns:
-        Formatted string for LLM prompt
-    """
-    constraints = get_style_constraints(profile_name)
-
+def _format_constraints(constraints: Mapping[str, Any]) -> str:
     lines = [
         f"Reading Level: {constraints.get('reading_level', 'Grade 8-10')}",
         f"Paragraph Length: {constraints.get('paragraph_target_sentences', '2-4')} sentences",
@@ -129,6 +128,22 @@ def format_constraints_for_prompt(profile_name: str = DEFAULT_PROFILE) -> str:
     return "\n".join(lines)
 
 
+# Profiles are frozen, so their prompt text is formatted once at import.
+_PROMPT_TEXTS = {name: _format_constraints(profile) for name, profile in STYLE_PROFILES.items()}
+
+
+def format_constraints_for_prompt(profile_name: str = DEFAULT_PROFILE) -> str:
+    """Format style constraints as text for inclusion in prompts.
+
+    Args:
+        profile_name: Name of the style profile
+
+    Returns:
+        Formatted string for LLM prompt
+    """
+    return _PROMPT_TEXTS.get(profile_name) or _PROMPT_TEXTS[DEFAULT_PROFILE]
+
+
 # Guidance for how to use RAG snippets
 RAG_USAGE_GUIDANCE = """
 IMPORTANT: The background snippets below are from our published articles.
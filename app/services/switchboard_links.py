@@ -4,34 +4,101 @@ Injects affiliate tracking links into article content.
 """
 
 import re
+from collections.abc import Callable
+from functools import lru_cache
 from typing import Optional
 
+_NON_ALNUM_RUN_RE = re.compile(r"[^A-Za-z0-9]+")
+_TOKEN_PART_RE = re.compile(r"[A-Za-z]+|\d+")
+_GENERIC_CODE_ANCHOR_RE = re.compile(r"\b(?:promo|bonus)\s+code\b")
 
+
+@lru_cache(maxsize=256)
+def _compile_brand_pattern(brand: str) -> re.Pattern:
+    """Plain brand mention (switchboard fallback anchor)."""
+    return re.compile(rf"({re.escape(brand)})", re.IGNORECASE)
+
+
+@lru_cache(maxsize=256)
+def _compile_switchboard_scan(brand: str) -> re.Pattern:
+    """Any <strong> anchor or a plain brand mention, in one alternation."""
+    return re.compile(
+        rf"(?P<strong><strong>(?P<inner>.*?)</strong>)|(?P<brand>{re.escape(brand)})",
+        re.IGNORECASE | re.DOTALL,
+    )
+
+
+@lru_cache(maxsize=256)
+def _compile_brand_review_pattern(brand: str) -> re.Pattern:
+    """Brand name NOT followed by "bonus code"/"promo code" (review links)."""
+    return re.compile(
+        rf"\b({re.escape(brand)})(?!\s+(?:bonus|promo|code)\s+code)",
+        re.IGNORECASE,
+    )
+
+
+@lru_cache(maxsize=1024)
 def _token_pattern(value: str) -> str:
     """Build a regex pattern that tolerates spaces/hyphens between letter/number groups."""
     if not value:
         return ""
-    cleaned = re.sub(r"[^A-Za-z0-9]+", " ", value).strip()
+    cleaned = _NON_ALNUM_RUN_RE.sub(" ", value).strip()
     if not cleaned:
         return re.escape(value)
-    parts = re.findall(r"[A-Za-z]+|\d+", cleaned)
+    parts = _TOKEN_PART_RE.findall(cleaned)
     if not parts:
         return re.escape(value)
     return r"[\s\-]*".join(re.escape(p) for p in parts)
 
 
+@lru_cache(maxsize=1024)
 def _normalize_token(value: str) -> str:
     """Normalize to alphanumeric only for comparisons."""
-    return re.sub(r"[^A-Za-z0-9]+", "", value or "").upper()
+    return _NON_ALNUM_RUN_RE.sub("", value or "").upper()
 
 
-def _inside_heading(text: str, pos: int) -> bool:
-    """Return True if position is inside an h1/h2/h3 tag."""
-    before = text[:pos].lower()
-    for tag in ("h1", "h2", "h3"):
-        if before.rfind(f"<{tag}") > before.rfind(f"</{tag}>"):
-            return True
-    return False
+_IN_HEADING = 1
+_IN_ANCHOR = 2
+
+# Comments (skipped, even when unterminated) and <a>/<h1-3> open/close tags.
+# Quoted attribute values may contain ">"; tag case is ignored.
+_CONTAINMENT_SCANNER = re.compile(
+    r"""<!--(?:.*?-->|.*)|<(?P<close>/?)(?P<tag>a|h[1-3])(?=[\s/>])(?:[^>"']|"[^"]*"|'[^']*')*>""",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def _containment_array(text: str) -> bytearray:
+    """Return one flag byte per offset of ``text`` (plus one past the end).
+
+    Each byte says whether that offset sits inside a heading (_IN_HEADING)
+    and/or an <a> (_IN_ANCHOR), so callers test a match with one index.
+    Headings and anchors do not nest (browsers close an open one when the
+    next starts), so each is tracked as a flag rather than a depth. The text
+    itself is never re-serialized; callers splice into the original markup.
+    """
+    state = bytearray(len(text) + 1)
+    flags = 0
+    last = 0
+    for match in _CONTAINMENT_SCANNER.finditer(text):
+        tag = match.group("tag")
+        if tag is None:
+            continue
+        bit = _IN_ANCHOR if len(tag) == 1 else _IN_HEADING
+        if match.group("close"):
+            # The closing tag itself is already outside the element.
+            offset, new_flags = match.start(), flags & ~bit
+        else:
+            # Content after the opening tag is inside the element.
+            offset, new_flags = match.end(), flags | bit
+        if new_flags == flags:
+            continue
+        if flags:
+            state[last:offset] = bytes((flags,)) * (offset - last)
+        flags, last = new_flags, offset
+    if flags:
+        state[last:] = bytes((flags,)) * (len(state) - last)
+    return state
 
 
 def inject_switchboard_links(
@@ -49,69 +116,80 @@ def inject_switchboard_links(
     """
     if not (brand and switchboard_url):
         return text
+    return make_switchboard_injector(brand, bonus_code or "", switchboard_url, max_links)(text)
 
-    links_injected = 0
-    brand_lower = brand.lower()
-    code_lower = (bonus_code or "").lower()
 
-    strong_any_pattern = re.compile(r"<strong>(.*?)</strong>", re.IGNORECASE | re.DOTALL)
-
-    def strong_replacer(match):
-        nonlocal links_injected
-        start = match.start()
-        if _inside_heading(text, start):
-            return match.group(0)
-        before = text[:start]
-        if "<a " in before and "</a>" not in before[before.rfind("<a "):]:
-            return match.group(0)
-        if links_injected >= max_links:
-            return match.group(0)
-        inner = match.group(1)
-        inner_lower = inner.lower()
-        brand_match = bool(brand_lower) and brand_lower in inner_lower
-        code_match = bool(code_lower) and code_lower in inner_lower
-        if re.search(r"\b(?:promo|bonus)\s+code\b", inner_lower):
-            return match.group(0)
-        # Do not wrap generic anchors like "<strong>promo code</strong>" for every offer.
-        if not (brand_match or code_match):
-            return match.group(0)
-        links_injected += 1
-        return (
-            f'<a data-id="switchboard_tracking" '
-            f'href="{switchboard_url}" '
-            f'rel="nofollow">'
-            f"<strong>{inner}</strong>"
-            f"</a>"
-        )
-
-    result = strong_any_pattern.sub(strong_replacer, text)
-
-    # Fallback: ensure at least one link using first brand mention
-    if links_injected == 0:
-        brand_pattern = re.compile(rf"({re.escape(brand)})", re.IGNORECASE)
-
-        def brand_replacer(match):
-            nonlocal links_injected
-            if links_injected >= 1:
-                return match.group(0)
-            start = match.start()
-            if _inside_heading(result, start):
-                return match.group(0)
-            before_text = result[:start]
-            if "<a " in before_text and "</a>" not in before_text[before_text.rfind("<a "):]:
-                return match.group(0)
-            links_injected += 1
-            return (
-                f'<a data-id="switchboard_tracking" '
-                f'href="{switchboard_url}" '
-                f'rel="nofollow">'
-                f"{match.group(1)}"
-                f"</a>"
-            )
-
-        result = brand_pattern.sub(brand_replacer, result, count=1)
+@lru_cache(maxsize=64)
+def make_switchboard_injector(
+    brand: str,
+    bonus_code: str,
+    switchboard_url: str,
+    max_links: int = 6,
+) -> Callable[[str], str]:
+    """Build inject_switchboard_links specialized to one offer.
 
-    return result
+    Articles in a batch share the same brand, code, and URL, so the patterns,
+    lowercased needles, and link markup are prepared once per offer and the
+    returned callable only does the per-text work.
+    """
+    brand_lower = brand.lower()
+    code_lower = bonus_code.lower()
+    scan = _compile_switchboard_scan(brand)
+    brand_pattern = _compile_brand_pattern(brand)
+    link_open = f'<a data-id="switchboard_tracking" href="{switchboard_url}" rel="nofollow">'
+    link_close = "</a>"
+
+    def inject(text: str) -> str:
+        # Most articles handed to a given offer never name it; skip parsing then.
+        text_lower = text.lower()
+        if brand_lower not in text_lower and not (code_lower and code_lower in text_lower):
+            return text
+
+        state = _containment_array(text)
+
+        def _linkable(pos: int) -> bool:
+            return not state[pos]
+
+        # One scan finds both <strong> anchors and plain brand mentions. The first
+        # brand mention (possibly inside a <strong>) is kept for the fallback.
+        edits: list[tuple[int, int, str]] = []
+        first_brand: re.Match | None = None
+        for match in scan.finditer(text):
+            if match.group("brand") is not None:
+                if first_brand is None:
+                    first_brand = match
+                continue
+            if first_brand is None:
+                first_brand = brand_pattern.search(text, match.start(), match.end())
+            if len(edits) >= max_links or not _linkable(match.start()):
+                continue
+            inner = match.group("inner")
+            inner_lower = inner.lower()
+            brand_match = bool(brand_lower) and brand_lower in inner_lower
+            code_match = bool(code_lower) and code_lower in inner_lower
+            if _GENERIC_CODE_ANCHOR_RE.search(inner_lower):
+                continue
+            # Do not wrap generic anchors like "<strong>promo code</strong>" for every offer.
+            if not (brand_match or code_match):
+                continue
+            edits.append((match.start(), match.end(), f"{link_open}<strong>{inner}</strong>{link_close}"))
+
+        # Fallback: ensure at least one link using first brand mention
+        if not edits and first_brand is not None and _linkable(first_brand.start()):
+            edits.append((first_brand.start(), first_brand.end(), f"{link_open}{first_brand.group(0)}{link_close}"))
+
+        if not edits:
+            return text
+        parts = []
+        last = 0
+        for start, end, replacement in edits:
+            parts.append(text[last:start])
+            parts.append(replacement)
+            last = end
+        parts.append(text[last:])
+        return "".join(parts)
+
+    return inject
 
 
 def inject_brand_links(
@@ -137,23 +215,18 @@ def inject_brand_links(
     if not (brand and review_url):
         return text
 
-    brand_escaped = re.escape(brand)
-
     # Match brand name NOT followed by "bonus code" or "promo code"
     # Negative lookahead to avoid double-linking
-    pattern = re.compile(
-        rf"\b({brand_escaped})(?!\s+(?:bonus|promo|code)\s+code)",
-        re.IGNORECASE,
-    )
+    pattern = _compile_brand_review_pattern(brand)
 
     links_injected = 0
+    state = _containment_array(text)
 
     def replacer(match):
         nonlocal links_injected
 
         # Skip if already inside an <a> tag
-        before_text = text[: match.start()]
-        if "<a" in before_text and "</a>" not in before_text[before_text.rfind("<a") :]:
+        if state[match.start()] & _IN_ANCHOR:
             return match.group(0)
 
         if links_injected >= max_links:
@@ -186,14 +259,7 @@ def build_switchboard_url(
     Returns:
         Fully constructed switchboard URL
     """
-    base = f"https://{switchboard_domain}/offers"
-    params = [
-        f"affiliateId={affiliate_id}",
-        f"campaignId={campaign_id}",
-        f"context={context}",
-        f"propertyId={property_id}",
-    ]
+    query = f"affiliateId={affiliate_id}&campaignId={campaign_id}&context={context}&propertyId={property_id}"
     if state_code:
-        params.append(f"stateCode={state_code}")
-
-    return f"{base}?{'&'.join(params)}"
+        query = f"{query}&stateCode={state_code}"
+    return f"https://{switchboard_domain}/offers?{query}"
@@ -0,0 +1,40 @@
+"""Small text and date helpers shared across services."""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+_TZ_CACHE: dict[str, ZoneInfo | None] = {}
+
+
+def strip_front_matter(text: str) -> str:
+    """Remove YAML front matter from markdown."""
+    if text.startswith("---"):
+        end = text.find("\n---", 3)
+        if end != -1:
+            return text[end + 4:]
+    return text
+
+
+def _zoneinfo(tz: str) -> ZoneInfo | None:
+    """Resolve a timezone name once per process (None if unknown)."""
+    if tz not in _TZ_CACHE:
+        try:
+            _TZ_CACHE[tz] = ZoneInfo(tz)
+        except Exception:
+            _TZ_CACHE[tz] = None
+    return _TZ_CACHE[tz]
+
+
+@lru_cache(maxsize=8)
+def _today_long_for_date(year: int, month: int, day: int) -> str:
+    d = date(year, month, day)
+    return f"{d.strftime('%A')}, {d.strftime('%B')} {day}, {year}"
+
+
+def today_long(tz: str = "US/Eastern") -> str:
+    """Get today's date in long format (formatted once per day)."""
+    now = datetime.now(_zoneinfo(tz))
+    return _today_long_for_date(now.year, now.month, now.day)
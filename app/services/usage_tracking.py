@@ -3,16 +3,38 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta
+import asyncio
+from collections.abc import AsyncIterator
+import copy
 import csv
 import io
-import json
+import time
 from typing import Optional
 
-from sqlalchemy import desc, func, select
+import orjson
+from sqlalchemy import String, bindparam, cast, desc, func, insert, literal, null, select, union_all
 
 from app.database import async_session_maker
 from app.models.usage_event import UsageEvent
 
+# Usage rows are buffered in-process and written in batches (one session and
+# commit per flush) instead of one commit per request. Readers flush first.
+USAGE_FLUSH_SECONDS = 0.5
+USAGE_FLUSH_MAX_ROWS = 500
+USAGE_MAX_PENDING = 10_000
+
+_pending_events: list[UsageEvent] = []
+_flush_timer: tuple[asyncio.AbstractEventLoop, asyncio.TimerHandle] | None = None
+_flush_tasks: set[asyncio.Task] = set()
+dropped_usage_events = 0
+
+# Admin dashboards poll the summary with the same window; a short TTL lets
+# repeat polls skip the aggregate query at the cost of slightly stale counts.
+USAGE_SUMMARY_TTL_SECONDS = 30
+USAGE_SUMMARY_MAX_KEYS = 32
+
+_summary_cache: dict[int, tuple[float, dict]] = {}
+
 
 def _to_iso(value: datetime | None) -> str | None:
     if value is None:
@@ -35,35 +57,206 @@ async def record_usage_event(
     user_agent: str | None = None,
     details: dict | str | None = None,
 ) -> None:
-    """Persist one usage event row. Never raises."""
+    """Queue one usage event row for the next batched write. Never raises."""
     try:
-        details_text: str | None
-        if details is None:
-            details_text = None
-        elif isinstance(details, str):
-            details_text = details
-        else:
-            details_text = json.dumps(details, ensure_ascii=False)
-
-        row = UsageEvent(
-            username=(username or "anonymous").strip() or "anonymous",
-            event_type=(event_type or "unknown").strip() or "unknown",
-            method=(method or "").strip() or None,
-            path=(path or "").strip() or None,
+        row = _build_usage_row(
+            username=username,
+            event_type=event_type,
+            method=method,
+            path=path,
             status_code=status_code,
             duration_ms=duration_ms,
-            ip_address=(ip_address or "").strip() or None,
-            user_agent=(user_agent or "").strip()[:1024] or None,
-            details=details_text,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            details=details,
         )
-        async with async_session_maker() as session:
-            session.add(row)
-            await session.commit()
+        _enqueue_usage_event(row)
     except Exception:
         # Usage tracking must never break app functionality.
         return
 
 
+def _build_usage_row(
+    *,
+    username: str,
+    event_type: str,
+    method: str | None,
+    path: str | None,
+    status_code: int | None,
+    duration_ms: float | None,
+    ip_address: str | None,
+    user_agent: str | None,
+    details: dict | str | None,
+) -> UsageEvent:
+    """Normalize inputs and serialize details into a UsageEvent row.
+
+    created_at is stamped here rather than by the server default, so a row
+    keeps the time of the request even when its batch is written later.
+    """
+    return UsageEvent(
+        created_at=datetime.utcnow(),
+        username=(username or "anonymous").strip() or "anonymous",
+        event_type=(event_type or "unknown").strip() or "unknown",
+        method=(method or "").strip() or None,
+        path=(path or "").strip() or None,
+        status_code=status_code,
+        duration_ms=duration_ms,
+        ip_address=(ip_address or "").strip() or None,
+        user_agent=(user_agent or "").strip()[:1024] or None,
+        details=_details_to_text(details),
+    )
+
+
+def _details_to_text(details: dict | str | None) -> str | None:
+    # Not memoized: a safe key for a details dict has to carry every key and
+    # value with its type (True vs 1, insertion order), and building one costs
+    # about 3x the orjson encode it would save.
+    if details is None or isinstance(details, str):
+        return details
+    return orjson.dumps(details, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _enqueue_usage_event(row: UsageEvent) -> None:
+    global _flush_timer, dropped_usage_events
+    if len(_pending_events) >= USAGE_MAX_PENDING:
+        dropped_usage_events += 1
+        return
+    _pending_events.append(row)
+
+    loop = asyncio.get_running_loop()
+    if len(_pending_events) >= USAGE_FLUSH_MAX_ROWS:
+        _spawn_flush(loop)
+    elif _flush_timer is None or _flush_timer[0] is not loop:
+        _flush_timer = (loop, loop.call_later(USAGE_FLUSH_SECONDS, _spawn_flush, loop))
+
+
+def _spawn_flush(loop: asyncio.AbstractEventLoop) -> None:
+    task = loop.create_task(flush_usage_events())
+    _flush_tasks.add(task)
+    task.add_done_callback(_flush_tasks.discard)
+
+
+async def flush_usage_events() -> int:
+    """Write all buffered usage events in one transaction. Never raises.
+
+    Returns the number of rows written. A failed write drops the batch; the
+    rows are counted in ``dropped_usage_events`` and the error is logged.
+    """
+    global _flush_timer, dropped_usage_events
+    if _flush_timer is not None:
+        _flush_timer[1].cancel()
+        _flush_timer = None
+    if not _pending_events:
+        return 0
+
+    rows = _pending_events[:]
+    _pending_events.clear()
+    try:
+        async with async_session_maker() as session:
+            await session.execute(insert(UsageEvent), _usage_insert_params(rows))
+            await session.commit()
+    except Exception as e:
+        dropped_usage_events += len(rows)
+        print(f"Failed to write {len(rows)} usage events: {e}")
+        return 0
+    return len(rows)
+
+
+async def drain_usage_events() -> None:
+    """Wait for in-flight background flushes, then write what is still buffered.
+
+    Called on shutdown so no batch is lost with the event loop, and by the
+    readers so a listing never misses a batch that is still being written.
+    """
+    if _flush_tasks:
+        await asyncio.gather(*list(_flush_tasks), return_exceptions=True)
+    await flush_usage_events()
+
+
+# id is left to its server default, as with session.add.
+_USAGE_INSERT_COLUMNS = (
+    "created_at",
+    "username",
+    "event_type",
+    "method",
+    "path",
+    "status_code",
+    "duration_ms",
+    "ip_address",
+    "user_agent",
+    "details",
+)
+
+
+def _usage_insert_params(rows: list[UsageEvent]) -> list[dict]:
+    """Parameter sets for one executemany INSERT inside the flush session.
+
+    The batch goes through the session's own transaction, and the driver
+    sends it as multi-row VALUES rather than one statement per row.
+    """
+    return [{column: getattr(row, column) for column in _USAGE_INSERT_COLUMNS} for row in rows]
+
+
+_USAGE_EVENT_FIELDS = (
+    "id",
+    "created_at",
+    "username",
+    "event_type",
+    "method",
+    "path",
+    "status_code",
+    "duration_ms",
+    "ip_address",
+    "user_agent",
+    "details",
+)
+_CREATED_AT_POS = _USAGE_EVENT_FIELDS.index("created_at")
+
+
+def _build_usage_events_stmt(by_username: bool, by_event_type: bool):
+    # Plain column rows: the listings are read-only, so ORM instances and the
+    # identity map are pure overhead.
+    stmt = (
+        select(*(getattr(UsageEvent, field) for field in _USAGE_EVENT_FIELDS))
+        .where(UsageEvent.created_at >= bindparam("cutoff"))
+        .order_by(desc(UsageEvent.created_at))
+        .limit(bindparam("limit"))
+    )
+    if by_username:
+        stmt = stmt.where(UsageEvent.username == bindparam("username"))
+    if by_event_type:
+        stmt = stmt.where(UsageEvent.event_type == bindparam("event_type"))
+    return stmt
+
+
+# Statements are built once per filter combination and reused with bound
+# values, so each call skips clause construction and cache-key generation.
+_USAGE_EVENTS_STMTS = {
+    (by_username, by_event_type): _build_usage_events_stmt(by_username, by_event_type)
+    for by_username in (False, True)
+    for by_event_type in (False, True)
+}
+
+
+def _usage_window_cutoff(days: int) -> datetime:
+    return datetime.utcnow() - timedelta(days=max(1, min(days, 3650)))
+
+
+def _usage_events_query(*, days: int, limit: int, username: str | None, event_type: str | None):
+    params = {"cutoff": _usage_window_cutoff(days), "limit": max(1, min(limit, 5000))}
+    if username:
+        params["username"] = username.strip()
+    if event_type:
+        params["event_type"] = event_type.strip()
+    return _USAGE_EVENTS_STMTS[(bool(username), bool(event_type))], params
+
+
+def _usage_event_row(row: tuple) -> list:
+    values = list(row)
+    values[_CREATED_AT_POS] = _to_iso(values[_CREATED_AT_POS])
+    return values
+
+
 async def list_usage_events(
     *,
     days: int = 30,
@@ -72,93 +265,107 @@ async def list_usage_events(
     event_type: str | None = None,
 ) -> list[dict]:
     """Return recent usage events."""
-    cutoff = datetime.utcnow() - timedelta(days=max(1, min(days, 3650)))
-    cap = max(1, min(limit, 5000))
+    await drain_usage_events()
+    stmt, params = _usage_events_query(days=days, limit=limit, username=username, event_type=event_type)
 
-    stmt = (
-        select(UsageEvent)
-        .where(UsageEvent.created_at >= cutoff)
-        .order_by(desc(UsageEvent.created_at))
-        .limit(cap)
+    async with async_session_maker() as session:
+        rows = (await session.execute(stmt, params)).all()
+
+    return [dict(zip(_USAGE_EVENT_FIELDS, _usage_event_row(row))) for row in rows]
+
+
+def _build_usage_summary_stmt():
+    # One round trip: every aggregate reads the same windowed CTE and comes
+    # back as (kind, key, count) rows.
+    window = (
+        select(UsageEvent.username, UsageEvent.event_type, UsageEvent.path)
+        .where(UsageEvent.created_at >= bindparam("cutoff"))
+        .cte("usage_window")
+    )
+    no_key = cast(null(), String)
+    top_paths = (
+        select(window.c.path.label("key"), func.count().label("n"))
+        .where(window.c.event_type == "api_request", window.c.path.is_not(None))
+        .group_by(window.c.path)
+        .order_by(desc(func.count()))
+        .limit(25)
+        .subquery()
+    )
+    return union_all(
+        select(literal("total"), no_key, func.count()).select_from(window),
+        select(literal("users"), no_key, func.count(func.distinct(window.c.username))),
+        select(literal("event_type"), window.c.event_type, func.count()).group_by(window.c.event_type),
+        select(literal("username"), window.c.username, func.count()).group_by(window.c.username),
+        select(literal("path"), top_paths.c.key, top_paths.c.n),
     )
-    if username:
-        stmt = stmt.where(UsageEvent.username == username.strip())
-    if event_type:
-        stmt = stmt.where(UsageEvent.event_type == event_type.strip())
 
-    async with async_session_maker() as session:
-        result = await session.execute(stmt)
-        rows = result.scalars().all()
-
-    events: list[dict] = []
-    for row in rows:
-        events.append({
-            "id": row.id,
-            "created_at": _to_iso(row.created_at),
-            "username": row.username,
-            "event_type": row.event_type,
-            "method": row.method,
-            "path": row.path,
-            "status_code": row.status_code,
-            "duration_ms": row.duration_ms,
-            "ip_address": row.ip_address,
-            "user_agent": row.user_agent,
-            "details": row.details,
-        })
-    return events
 
+_USAGE_SUMMARY_STMT = _build_usage_summary_stmt()
 
-async def usage_summary(*, days: int = 30) -> dict:
-    """Return aggregated usage metrics."""
-    cutoff = datetime.utcnow() - timedelta(days=max(1, min(days, 3650)))
 
-    async with async_session_maker() as session:
-        total_stmt = select(func.count(UsageEvent.id)).where(UsageEvent.created_at >= cutoff)
-        total = int((await session.execute(total_stmt)).scalar() or 0)
+async def usage_summary(*, days: int = 30) -> dict:
+    """Return aggregated usage metrics (cached for USAGE_SUMMARY_TTL_SECONDS)."""
+    cached = _summary_cache.get(days)
+    if cached:
+        expires_at, payload = cached
+        if expires_at >= time.time():
+            return copy.deepcopy(payload)
+        _summary_cache.pop(days, None)
 
-        unique_users_stmt = (
-            select(func.count(func.distinct(UsageEvent.username)))
-            .where(UsageEvent.created_at >= cutoff)
-        )
-        unique_users = int((await session.execute(unique_users_stmt)).scalar() or 0)
+    await drain_usage_events()
 
-        by_event_stmt = (
-            select(UsageEvent.event_type, func.count(UsageEvent.id))
-            .where(UsageEvent.created_at >= cutoff)
-            .group_by(UsageEvent.event_type)
-            .order_by(desc(func.count(UsageEvent.id)))
-        )
-        by_event_rows = (await session.execute(by_event_stmt)).all()
+    async with async_session_maker() as session:
+        rows = (await session.execute(_USAGE_SUMMARY_STMT, {"cutoff": _usage_window_cutoff(days)})).all()
 
-        by_user_stmt = (
-            select(UsageEvent.username, func.count(UsageEvent.id))
-            .where(UsageEvent.created_at >= cutoff)
-            .group_by(UsageEvent.username)
-            .order_by(desc(func.count(UsageEvent.id)))
-        )
-        by_user_rows = (await session.execute(by_user_stmt)).all()
-
-        top_paths_stmt = (
-            select(UsageEvent.path, func.count(UsageEvent.id))
-            .where(
-                UsageEvent.created_at >= cutoff,
-                UsageEvent.event_type == "api_request",
-                UsageEvent.path.is_not(None),
-            )
-            .group_by(UsageEvent.path)
-            .order_by(desc(func.count(UsageEvent.id)))
-            .limit(25)
-        )
-        top_paths_rows = (await session.execute(top_paths_stmt)).all()
+    totals = {"total": 0, "users": 0}
+    groups: dict[str, list[tuple[str, int]]] = {"event_type": [], "username": [], "path": []}
+    for kind, key, count in rows:
+        if kind in totals:
+            totals[kind] = int(count or 0)
+        else:
+            groups[kind].append((key, int(count)))
+    for pairs in groups.values():
+        pairs.sort(key=lambda pair: pair[1], reverse=True)
 
-    return {
+    payload = {
         "days": days,
-        "total_events": total,
-        "unique_users": unique_users,
-        "by_event_type": [{"event_type": row[0], "count": int(row[1])} for row in by_event_rows],
-        "by_user": [{"username": row[0], "count": int(row[1])} for row in by_user_rows],
-        "top_api_paths": [{"path": row[0], "count": int(row[1])} for row in top_paths_rows],
+        "total_events": totals["total"],
+        "unique_users": totals["users"],
+        "by_event_type": [{"event_type": key, "count": n} for key, n in groups["event_type"]],
+        "by_user": [{"username": key, "count": n} for key, n in groups["username"]],
+        "top_api_paths": [{"path": key, "count": n} for key, n in groups["path"]],
     }
+    if len(_summary_cache) >= USAGE_SUMMARY_MAX_KEYS:
+        oldest = min(_summary_cache.items(), key=lambda item: item[1][0])[0]
+        _summary_cache.pop(oldest, None)
+    _summary_cache[days] = (time.time() + USAGE_SUMMARY_TTL_SECONDS, payload)
+    return copy.deepcopy(payload)
+
+
+async def iter_usage_events_csv(
+    *,
+    days: int = 30,
+    limit: int = 5000,
+    username: str | None = None,
+    event_type: str | None = None,
+    batch_size: int = 500,
+) -> AsyncIterator[str]:
+    """Yield recent usage events as CSV text, one chunk per batch of rows."""
+    await drain_usage_events()
+    stmt, params = _usage_events_query(days=days, limit=limit, username=username, event_type=event_type)
+
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(_USAGE_EVENT_FIELDS)
+    yield buf.getvalue()
+
+    async with async_session_maker() as session:
+        result = await session.stream(stmt.execution_options(yield_per=batch_size), params)
+        async for rows in result.partitions(batch_size):
+            buf.seek(0)
+            buf.truncate(0)
+            writer.writerows(_usage_event_row(row) for row in rows)
+            yield buf.getvalue()
 
 
 async def usage_events_csv(
@@ -169,34 +376,9 @@ async def usage_events_csv(
     event_type: str | None = None,
 ) -> str:
     """Export recent usage events as CSV."""
-    events = await list_usage_events(days=days, limit=limit, username=username, event_type=event_type)
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([
-        "id",
-        "created_at",
-        "username",
-        "event_type",
-        "method",
-        "path",
-        "status_code",
-        "duration_ms",
-        "ip_address",
-        "user_agent",
-        "details",
+    return "".join([
+        chunk
+        async for chunk in iter_usage_events_csv(
+            days=days, limit=limit, username=username, event_type=event_type
+        )
     ])
-    for row in events:
-        writer.writerow([
-            row.get("id"),
-            row.get("created_at"),
-            row.get("username"),
-            row.get("event_type"),
-            row.get("method"),
-            row.get("path"),
-            row.get("status_code"),
-            row.get("duration_ms"),
-            row.get("ip_address"),
-            row.get("user_agent"),
-            row.get("details"),
-        ])
-    return output.getvalue()
@@ -30,6 +30,14 @@ function streamGeneration(url, data, targetElement, onComplete) {
                 }
                 break;
 
+            case 'tokens':
+                // Batched tokens (list) - append in order
+                const batchEl = target.querySelector('.streaming-content');
+                if (batchEl) {
+                    batchEl.innerHTML += parsed.content.join('');
+                }
+                break;
+
             case 'done':
                 eventSource.close();
                 if (onComplete) {
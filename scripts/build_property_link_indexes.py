@@ -9,12 +9,17 @@ from __future__ import annotations
 import argparse
 import asyncio
 import hashlib
-import json
 import re
 from pathlib import Path
-from urllib.parse import urlsplit, urlunsplit
+from urllib.parse import SplitResult, urlsplit, urlunsplit
 
 from app.services.internal_links import get_links_store
+from app.services.io_utils import write_jsonl
+
+try:  # uvloop ships with uvicorn[standard] on POSIX; faster loop for the embedding calls
+    from uvloop import run as _run_async
+except ImportError:  # pragma: no cover - stdlib fallback (e.g. Windows)
+    _run_async = asyncio.run
 
 
 PROPERTY_BY_DOMAIN = {
@@ -26,37 +31,61 @@ PROPERTY_BY_DOMAIN = {
 }
 
 OPERATOR_PATTERNS: list[tuple[re.Pattern[str], str]] = [
-    (re.compile(r"\bbet365\b", re.IGNORECASE), "bet365"),
-    (re.compile(r"\bfanduel\b", re.IGNORECASE), "fanduel"),
-    (re.compile(r"\bdraftkings\b", re.IGNORECASE), "draftkings"),
-    (re.compile(r"\bbetmgm\b", re.IGNORECASE), "betmgm"),
-    (re.compile(r"\bcaesars\b", re.IGNORECASE), "caesars"),
-    (re.compile(r"\bfanatics\b", re.IGNORECASE), "fanatics"),
-    (re.compile(r"\bunderdog\b", re.IGNORECASE), "underdog"),
-    (re.compile(r"\bsleeper\b", re.IGNORECASE), "sleeper"),
-    (re.compile(r"\bkalshi\b", re.IGNORECASE), "kalshi"),
-    (re.compile(r"\bnovig\b", re.IGNORECASE), "novig"),
-    (re.compile(r"\bthescore\b|\bthe score\b", re.IGNORECASE), "thescore"),
-    (re.compile(r"\bcrypto\.com\b|\bcrypto\b", re.IGNORECASE), "crypto"),
-    (re.compile(r"\bfliff\b", re.IGNORECASE), "fliff"),
-    (re.compile(r"\bpolymarket\b", re.IGNORECASE), "polymarket"),
-    (re.compile(r"\bdabble\b", re.IGNORECASE), "dabble"),
-    (re.compile(r"\bprophetx\b|\bprophet\b", re.IGNORECASE), "prophetx"),
+    (re.compile(r"\bbet365\b"), "bet365"),
+    (re.compile(r"\bfanduel\b"), "fanduel"),
+    (re.compile(r"\bdraftkings\b"), "draftkings"),
+    (re.compile(r"\bbetmgm\b"), "betmgm"),
+    (re.compile(r"\bcaesars\b"), "caesars"),
+    (re.compile(r"\bfanatics\b"), "fanatics"),
+    (re.compile(r"\bunderdog\b"), "underdog"),
+    (re.compile(r"\bsleeper\b"), "sleeper"),
+    (re.compile(r"\bkalshi\b"), "kalshi"),
+    (re.compile(r"\bnovig\b"), "novig"),
+    (re.compile(r"\bthescore\b|\bthe score\b"), "thescore"),
+    (re.compile(r"\bcrypto\.com\b|\bcrypto\b"), "crypto"),
+    (re.compile(r"\bfliff\b"), "fliff"),
+    (re.compile(r"\bpolymarket\b"), "polymarket"),
+    (re.compile(r"\bdabble\b"), "dabble"),
+    (re.compile(r"\bprophetx\b|\bprophet\b"), "prophetx"),
 ]
+ALWAYS_INCLUDE_PHRASES: dict[str, tuple[str, ...]] = {
+    "action_network": ("best betting sites", "legal sports betting", "best sportsbooks"),
+    "vegas_insider": (
+        "best sportsbook promos",
+        "best online casinos",
+        "new sweepstakes casinos",
+        "best prediction markets",
+    ),
+    "sportshandle": ("best betting sites", "best sports betting apps", "best prediction market apps"),
+    "rotogrinders": ("best prediction market apps", "best dfs apps"),
+    "fantasy_labs": ("nfl dfs", "best dfs apps", "top dfs sites"),
+}
+
+# Patterns run against lowercased text, so they need no IGNORECASE. Each is
+# paired with a literal every match contains (default: the operator key);
+# checking it with `in` first skips most regex searches.
+_OPERATOR_NEEDLES = {"thescore": "score", "prophetx": "prophet"}
+_OPERATOR_SCAN = [(_OPERATOR_NEEDLES.get(value, value), pattern, value) for pattern, value in OPERATOR_PATTERNS]
 
+_URL_RE = re.compile(r"https?://\S+")
+_SLUG_SEPARATOR_RE = re.compile(r"[-_]+")
+_CAMEL_TAIL_RE = re.compile(r"^(.*?)([A-Z][A-Za-z0-9.\-]+)$")
+_REPEATED_TAIL_RE = re.compile(r"^([a-z0-9\-]{2,})\1$")
 
-def _detect_operator(text: str) -> str:
-    for pattern, value in OPERATOR_PATTERNS:
-        if pattern.search(text):
+
+def _detect_operator(lowered: str) -> str:
+    """Return the operator mentioned in already-lowercased text."""
+    for needle, pattern, value in _OPERATOR_SCAN:
+        if needle in lowered and pattern.search(lowered):
             return value
     return ""
 
 
 def _split_url_and_title(raw: str) -> tuple[str, str]:
-    line = re.sub(r"\s+", " ", raw).strip()
+    line = " ".join(raw.split())
     if not line:
         return "", ""
-    match = re.search(r"https?://\S+", line)
+    match = _URL_RE.search(line)
     if not match:
         return "", ""
     url = match.group(0).strip()
@@ -71,19 +100,21 @@ def _normalize_domain(netloc: str) -> str:
     return netloc
 
 
-def _property_for_url(url: str) -> str:
-    domain = _normalize_domain(urlsplit(url).netloc)
-    for known, prop in PROPERTY_BY_DOMAIN.items():
-        if domain == known or domain.endswith("." + known):
+def _property_for_url(url: str, parsed: SplitResult | None = None) -> str:
+    # Probe the domain and each parent domain (a.b.com, b.com, com) instead
+    # of suffix-testing every known property domain.
+    labels = _normalize_domain((parsed or urlsplit(url)).netloc).split(".")
+    for i in range(len(labels)):
+        prop = PROPERTY_BY_DOMAIN.get(".".join(labels[i:]))
+        if prop:
             return prop
     return ""
 
 
-def _derive_title_from_url(url: str) -> str:
-    path = urlsplit(url).path.strip("/")
+def _derive_title_from_url(url: str, parsed: SplitResult | None = None) -> str:
+    path = (parsed or urlsplit(url)).path.strip("/")
     tail = path.split("/")[-1] if path else "resource"
-    tail = re.sub(r"[-_]+", " ", tail).strip()
-    tail = re.sub(r"\s+", " ", tail)
+    tail = " ".join(_SLUG_SEPARATOR_RE.sub(" ", tail).split())
     return tail.title() if tail else "Resource"
 
 
@@ -103,13 +134,15 @@ def _clean_url_and_title(url: str, title: str) -> tuple[str, str]:
     label = title.strip()
 
     # Handle accidentally concatenated title fragments at the end of URL paths.
-    camel_tail = re.match(r"^(.*?)([A-Z][A-Za-z0-9.\-]+)$", tail)
+    # Slugs are normally lowercase, so only tails with an uppercase letter can match.
+    camel_tail = _CAMEL_TAIL_RE.match(tail) if tail.lower() != tail else None
     if camel_tail and camel_tail.group(1):
         tail = camel_tail.group(1)
         label = f"{camel_tail.group(2)} {label}".strip()
 
     # Handle repeated slug tails: e.g. bet365bet365, nflnfl.
-    repeated = re.match(r"^([a-z0-9\-]{2,})\1$", tail)
+    half = len(tail) // 2
+    repeated = _REPEATED_TAIL_RE.match(tail) if tail[:half] == tail[half:] else None
     if repeated:
         base = repeated.group(1)
         tail = base
@@ -137,36 +170,13 @@ def _clean_url_and_title(url: str, title: str) -> tuple[str, str]:
     clean_url = urlunsplit((parsed.scheme, parsed.netloc, clean_path, parsed.query, parsed.fragment))
     clean_url = clean_url.rstrip("/") if clean_path != "/" else clean_url
 
-    label = re.sub(r"\s+", " ", label).strip(" -")
+    label = " ".join(label.split()).strip(" -")
     return clean_url, label
 
 
-def _always_include(property_key: str, title: str) -> bool:
-    text = title.lower()
-    if property_key == "action_network":
-        return (
-            "best betting sites" in text
-            or "legal sports betting" in text
-            or "best sportsbooks" in text
-        )
-    if property_key == "vegas_insider":
-        return (
-            "best sportsbook promos" in text
-            or "best online casinos" in text
-            or "new sweepstakes casinos" in text
-            or "best prediction markets" in text
-        )
-    if property_key == "sportshandle":
-        return (
-            "best betting sites" in text
-            or "best sports betting apps" in text
-            or "best prediction market apps" in text
-        )
-    if property_key == "rotogrinders":
-        return ("best prediction market apps" in text or "best dfs apps" in text)
-    if property_key == "fantasy_labs":
-        return ("nfl dfs" in text or "best dfs apps" in text or "top dfs sites" in text)
-    return False
+def _always_include(property_key: str, text: str) -> bool:
+    """Whether a (lowercased) title is a must-have evergreen link for the property."""
+    return any(phrase in text for phrase in ALWAYS_INCLUDE_PHRASES.get(property_key, ()))
 
 
 async def build_indexes(seed_file: Path) -> None:
@@ -174,54 +184,72 @@ async def build_indexes(seed_file: Path) -> None:
         raise FileNotFoundError(f"Seed file not found: {seed_file}")
 
     output_by_property: dict[str, list[dict]] = {k: [] for k in PROPERTY_BY_DOMAIN.values()}
-    seen_by_property: dict[str, set[str]] = {k: set() for k in PROPERTY_BY_DOMAIN.values()}
-
-    for raw in seed_file.read_text(encoding="utf-8").splitlines():
-        url, title = _split_url_and_title(raw)
-        if not url:
-            continue
-        url, title = _clean_url_and_title(url, title)
-        if not url:
-            continue
-
-        property_key = _property_for_url(url)
-        if not property_key:
-            continue
-
-        if not title:
-            title = _derive_title_from_url(url)
-        title = re.sub(r"\s+", " ", title).strip()
-
-        dedupe_key = f"{url}::{title.lower()}"
-        if dedupe_key in seen_by_property[property_key]:
-            continue
-        seen_by_property[property_key].add(dedupe_key)
-
-        operator = _detect_operator(f"{title} {url}")
-        record = {
-            "id": hashlib.sha1(dedupe_key.encode("utf-8")).hexdigest()[:16],
-            "url": url,
-            "title": title,
-            "summary": title,
-            "recommended_anchors": [title.lower()],
-            "operator": operator,
-            "always_include": _always_include(property_key, title),
-        }
-        output_by_property[property_key].append(record)
-
-    # Write property jsonl files.
+    # Seen records are tracked by the 64-bit digest that also forms the record
+    # id, not by the full "url::title" string.
+    seen_by_property: dict[str, set[int]] = {k: set() for k in PROPERTY_BY_DOMAIN.values()}
+
+    with seed_file.open("r", encoding="utf-8") as fh:
+        for raw in fh:
+            # Lines that never mention a known property domain cannot map to a
+            # property; reject them before any parsing.
+            lowered = raw.lower()
+            if not any(domain in lowered for domain in PROPERTY_BY_DOMAIN):
+                continue
+            url, title = _split_url_and_title(raw)
+            if not url:
+                continue
+            url, title = _clean_url_and_title(url, title)
+            if not url:
+                continue
+
+            # Parse the cleaned URL once for the domain and title fallback.
+            parsed = urlsplit(url)
+            property_key = _property_for_url(url, parsed)
+            if not property_key:
+                continue
+
+            if not title:
+                title = _derive_title_from_url(url, parsed)
+            title = " ".join(title.split())
+
+            title_lower = title.lower()
+            digest = hashlib.blake2b(f"{url}::{title_lower}".encode(), digest_size=8).digest()
+            seen_key = int.from_bytes(digest, "big")
+            if seen_key in seen_by_property[property_key]:
+                continue
+            seen_by_property[property_key].add(seen_key)
+
+            operator = _detect_operator(f"{title_lower} {url.lower()}")
+            record = {
+                "id": digest.hex(),
+                "url": url,
+                "title": title,
+                "summary": title,
+                "recommended_anchors": [title_lower],
+                "operator": operator,
+                "always_include": _always_include(property_key, title_lower),
+            }
+            output_by_property[property_key].append(record)
+
+    # Write property jsonl files on worker threads so the file writes overlap.
+    out_paths = {key: Path("data") / f"evergreen_{key}.jsonl" for key in output_by_property}
+    Path("data").mkdir(parents=True, exist_ok=True)
+    await asyncio.gather(*[
+        asyncio.to_thread(write_jsonl, out_paths[property_key], rows)
+        for property_key, rows in output_by_property.items()
+    ])
     for property_key, rows in output_by_property.items():
-        out_path = Path("data") / f"evergreen_{property_key}.jsonl"
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(out_path, "w", encoding="utf-8") as f:
-            for row in rows:
-                f.write(json.dumps(row, ensure_ascii=False) + "\n")
-        print(f"Wrote {len(rows)} rows -> {out_path}")
-
-    # Rebuild each property index.
-    for property_key in output_by_property:
-        store = get_links_store(property_key=property_key)
-        count = await store.ingest_from_jsonl(path=Path("data") / f"evergreen_{property_key}.jsonl")
+        print(f"Wrote {len(rows)} rows -> {out_paths[property_key]}")
+
+    # Rebuild every property index concurrently; each store writes its own
+    # files and the work is dominated by embedding requests.
+    counts = await asyncio.gather(*[
+        get_links_store(property_key=property_key).ingest_from_jsonl(
+            path=Path("data") / f"evergreen_{property_key}.jsonl"
+        )
+        for property_key in output_by_property
+    ])
+    for property_key, count in zip(output_by_property, counts):
         print(f"Indexed {count} links for {property_key}")
 
 
@@ -234,7 +262,7 @@ def main() -> None:
         help="Path to raw seed text file with URL and optional title per line.",
     )
     args = parser.parse_args()
-    asyncio.run(build_indexes(Path(args.seed)))
+    _run_async(build_indexes(Path(args.seed)))
 
 
 if __name__ == "__main__":
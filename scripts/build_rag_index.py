@@ -6,6 +6,11 @@ from pathlib import Path
 
 from app.services.rag_builder import build_rag_index
 
+try:  # uvloop ships with uvicorn[standard] on POSIX; faster loop for the embedding calls
+    from uvloop import run as _run_async
+except ImportError:  # pragma: no cover - stdlib fallback (e.g. Windows)
+    _run_async = asyncio.run
+
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Build FAISS RAG index from articles.")
@@ -22,7 +27,7 @@ def main() -> None:
 
     source = Path(args.source) if args.source else None
 
-    count = asyncio.run(build_rag_index(
+    count = _run_async(build_rag_index(
         source_dir=source,
         chunk_size=args.chunk_size,
         overlap=args.overlap,
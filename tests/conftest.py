@@ -1,5 +1,9 @@
 """Pytest fixtures for PlanWrite v2 tests."""
 
+import os
+import shutil
+import tempfile
+
 import pytest
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
@@ -14,25 +18,44 @@ from app.services import usage_tracking
 app_settings.auth_enabled = False
 
 
-# Test database
-TEST_DATABASE_URL = "sqlite+aiosqlite:///./storage/test.db"
+# Test database: a throwaway SQLite file per run, outside the repo's storage
+# directory, so each session gets its own pooled connection.
+_TEST_DB_DIR = tempfile.mkdtemp(prefix="planwrite-tests-")
+TEST_DATABASE_URL = f"sqlite+aiosqlite:///{os.path.join(_TEST_DB_DIR, 'test.db')}"
 test_engine = create_async_engine(TEST_DATABASE_URL, echo=False)
 test_session_maker = async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
 
 
+_schema_created = False
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _test_db_dir():
+    """Remove the run's temporary database directory once the session ends."""
+    yield
+    shutil.rmtree(_TEST_DB_DIR, ignore_errors=True)
+
+
 @pytest.fixture
 async def db_session():
-    """Create a fresh database session for each test."""
+    """Create a fresh database session for each test.
+
+    The schema is rebuilt once per run; later tests only empty the tables,
+    which avoids re-running DDL for every test.
+    """
+    global _schema_created
     async with test_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
+        if not _schema_created:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+            _schema_created = True
+        else:
+            for table in reversed(Base.metadata.sorted_tables):
+                await conn.execute(table.delete())
 
     async with test_session_maker() as session:
         yield session
 
-    async with test_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-
 
 @pytest.fixture
 async def client(db_session):
@@ -43,10 +66,15 @@ async def client(db_session):
     app.dependency_overrides[get_db] = override_get_db
     original_usage_session_maker = usage_tracking.async_session_maker
     usage_tracking.async_session_maker = test_session_maker
+    usage_tracking._summary_cache.clear()
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
 
+    # Release the test session's write lock so the usage flush does not wait
+    # out SQLite's busy timeout.
+    await db_session.rollback()
+    await usage_tracking.flush_usage_events()
     usage_tracking.async_session_maker = original_usage_session_maker
     app.dependency_overrides.clear()
@@ -1,5 +1,7 @@
 """Usage tracking API tests."""
 
+import json
+
 import pytest
 
 
@@ -26,3 +28,132 @@ async def test_usage_export_returns_csv(client):
     assert resp.headers.get("content-type", "").startswith("text/csv")
     body = resp.text
     assert "username,event_type,method,path,status_code" in body
+
+
+@pytest.mark.asyncio
+async def test_usage_events_are_buffered_until_flush(client):
+    from app.services import usage_tracking
+
+    await usage_tracking.flush_usage_events()
+    for i in range(3):
+        await usage_tracking.record_usage_event(username="alice", event_type="batch_test", details={"i": i})
+
+    assert len(usage_tracking._pending_events) == 3
+
+    events = await usage_tracking.list_usage_events(event_type="batch_test")
+
+    assert not usage_tracking._pending_events
+    assert sorted(json.loads(e["details"])["i"] for e in events) == [0, 1, 2]
+    assert tuple(events[0]) == usage_tracking._USAGE_EVENT_FIELDS
+    assert isinstance(events[0]["created_at"], str)
+
+
+@pytest.mark.asyncio
+async def test_failed_usage_flush_counts_dropped_rows(client, monkeypatch):
+    from app.services import usage_tracking
+
+    def _broken_session_maker():
+        raise RuntimeError("database unavailable")
+
+    await usage_tracking.flush_usage_events()
+    for i in range(3):
+        await usage_tracking.record_usage_event(username="alice", event_type="drop_test")
+    before = usage_tracking.dropped_usage_events
+    monkeypatch.setattr(usage_tracking, "async_session_maker", _broken_session_maker)
+
+    assert await usage_tracking.flush_usage_events() == 0
+    assert usage_tracking.dropped_usage_events == before + 3
+    assert not usage_tracking._pending_events
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_in_flight_flushes(client):
+    import asyncio
+
+    from app.services import usage_tracking
+
+    await usage_tracking.record_usage_event(username="carol", event_type="drain_test")
+    usage_tracking._spawn_flush(asyncio.get_running_loop())
+    await usage_tracking.record_usage_event(username="carol", event_type="drain_test")
+    in_flight = set(usage_tracking._flush_tasks)
+
+    await usage_tracking.drain_usage_events()
+
+    assert in_flight and all(task.done() for task in in_flight)
+    assert not usage_tracking._pending_events
+    events = await usage_tracking.list_usage_events(event_type="drain_test")
+    assert len(events) == 2
+
+
+@pytest.mark.asyncio
+async def test_readers_wait_for_in_flight_flush(client):
+    import asyncio
+
+    from app.services import usage_tracking
+
+    for _ in range(3):
+        await usage_tracking.record_usage_event(username="dave", event_type="reader_test")
+    usage_tracking._spawn_flush(asyncio.get_running_loop())
+    # Let the flush take the buffered rows, so only the task can write them.
+    await asyncio.sleep(0)
+    assert not usage_tracking._pending_events
+    assert usage_tracking._flush_tasks
+
+    events = await usage_tracking.list_usage_events(event_type="reader_test")
+
+    assert len(events) == 3
+
+
+@pytest.mark.asyncio
+async def test_usage_csv_streams_rows_in_batches(client):
+    from app.services import usage_tracking
+
+    for i in range(5):
+        await usage_tracking.record_usage_event(username="bob", event_type="csv_test", path=f"/p{i}")
+
+    chunks = [
+        chunk
+        async for chunk in usage_tracking.iter_usage_events_csv(event_type="csv_test", batch_size=2)
+    ]
+
+    assert chunks[0].startswith("id,created_at,username,event_type")
+    assert len(chunks) == 4
+    assert "".join(chunks).count(",bob,csv_test,") == 5
+
+
+@pytest.mark.asyncio
+async def test_usage_summary_aggregates_window(client):
+    from app.services import usage_tracking
+
+    events = [
+        ("alice", "api_request", "/a"),
+        ("alice", "api_request", "/a"),
+        ("bob", "api_request", "/b"),
+        ("bob", "login", None),
+        ("carol", "api_request", None),
+    ]
+    for username, event_type, path in events:
+        await usage_tracking.record_usage_event(username=username, event_type=event_type, path=path)
+
+    summary = await usage_tracking.usage_summary(days=1)
+
+    assert summary["total_events"] == 5
+    assert summary["unique_users"] == 3
+    assert summary["by_event_type"] == [
+        {"event_type": "api_request", "count": 4},
+        {"event_type": "login", "count": 1},
+    ]
+    assert summary["by_user"][2] == {"username": "carol", "count": 1}
+    assert summary["top_api_paths"] == [{"path": "/a", "count": 2}, {"path": "/b", "count": 1}]
+
+
+@pytest.mark.asyncio
+async def test_usage_summary_is_cached_per_window(client):
+    from app.services import usage_tracking
+
+    await usage_tracking.record_usage_event(username="dana", event_type="login")
+    first = await usage_tracking.usage_summary(days=2)
+    await usage_tracking.record_usage_event(username="dana", event_type="login")
+
+    assert await usage_tracking.usage_summary(days=2) == first
+    assert (await usage_tracking.usage_summary(days=3))["total_events"] == first["total_events"] + 1
@@ -0,0 +1,59 @@
+"""Shared fixtures for outline service tests."""
+
+import pytest
+
+import app.services.outline as outline_mod
+from app.services.outline_cache import OutlineCache, SemanticOutlineCache
+
+
+@pytest.fixture(autouse=True)
+def _isolated_outline_cache(monkeypatch, tmp_path):
+    """Give each test an empty outline cache and no semantic cache."""
+    cache = OutlineCache(tmp_path / "outlines.sqlite3")
+    monkeypatch.setattr(outline_mod, "outline_cache", cache)
+    monkeypatch.setattr(outline_mod, "semantic_outline_cache", SemanticOutlineCache(enabled=False))
+    return cache
+
+
+class FakeOutlineLLM:
+    """Stands in for RAG and the LLM inside app.services.outline.
+
+    Tests set ``articles``, ``completion``, ``chunks`` and ``error`` to shape
+    the responses, and read ``calls``, ``rag_queries`` and ``stream_kwargs``.
+    """
+
+    def __init__(self):
+        self.calls = {"rag": 0, "completion": 0, "stream": 0}
+        self.articles: list[dict] = []
+        self.completion = "[INTRO]\n[SHORTCODE]\n[H2: Overview]\n[H2: Terms]"
+        self.chunks = ["[INTRO]\n[SHORTCODE]\n[H2: Overview]\n"]
+        # Raised by the stream after its chunks, to simulate a dropped connection
+        self.error: Exception | None = None
+        self.rag_queries: list[tuple] = []
+        self.stream_kwargs: dict = {}
+
+    async def query_articles(self, query, k=None, snippet_chars=None):
+        self.calls["rag"] += 1
+        self.rag_queries.append((query, k, snippet_chars))
+        return list(self.articles)
+
+    async def generate_completion(self, *args, **kwargs):
+        self.calls["completion"] += 1
+        return self.completion
+
+    async def generate_completion_streaming(self, *args, **kwargs):
+        self.calls["stream"] += 1
+        self.stream_kwargs = kwargs
+        for chunk in self.chunks:
+            yield chunk
+        if self.error is not None:
+            raise self.error
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    fake = FakeOutlineLLM()
+    monkeypatch.setattr(outline_mod, "query_articles", fake.query_articles)
+    monkeypatch.setattr(outline_mod, "generate_completion", fake.generate_completion)
+    monkeypatch.setattr(outline_mod, "generate_completion_streaming", fake.generate_completion_streaming)
+    return fake
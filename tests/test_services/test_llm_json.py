@@ -0,0 +1,26 @@
+"""Tests for JSON salvage on structured LLM output."""
+
+import json
+
+from app.services.llm import _extract_json_block
+
+
+def test_extract_ignores_surrounding_prose():
+    text = 'Here you go:\n```json\n{"outline": [{"title": "A"}]}\n```\nLet me know!'
+
+    assert json.loads(_extract_json_block(text)) == {"outline": [{"title": "A"}]}
+
+
+def test_extract_skips_brackets_inside_strings():
+    text = '[{"title": "Odds [boosted] }", "note": "say \\"hi\\""}] trailing ]'
+
+    block = _extract_json_block(text)
+
+    assert block == '[{"title": "Odds [boosted] }", "note": "say \\"hi\\""}]'
+    assert json.loads(block)[0]["title"] == "Odds [boosted] }"
+
+
+def test_extract_returns_none_for_unbalanced_input():
+    assert _extract_json_block('{"outline": [1, 2') is None
+    assert _extract_json_block("no json at all") is None
+    assert _extract_json_block('{"a": [1}') is None
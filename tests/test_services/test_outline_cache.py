@@ -0,0 +1,189 @@
+"""Tests for legacy token outline caching."""
+
+import numpy as np
+import pytest
+
+import app.services.outline as outline_mod
+import app.services.outline_cache as cache_mod
+from app.services.outline_cache import OutlineCache, SemanticOutlineCache, outline_cache_key
+
+
+@pytest.mark.asyncio
+async def test_generate_outline_serves_repeat_requests_from_cache(fake_llm):
+    first = await outline_mod.generate_outline("bet365 bonus code", "bet365 Bonus Code", brand="bet365")
+    second = await outline_mod.generate_outline("  bet365 bonus code", "bet365 Bonus Code ", brand="bet365")
+
+    assert first == second
+    assert fake_llm.calls == {"rag": 1, "completion": 1, "stream": 0}
+
+    second.append("[H2: Mutated]")
+    third = await outline_mod.generate_outline("bet365 bonus code", "bet365 Bonus Code", brand="bet365")
+    assert "[H2: Mutated]" not in third
+
+    # Outlines echo the keyword text, so other casings get their own entry
+    await outline_mod.generate_outline("BET365 Bonus Code", "bet365 Bonus Code", brand="bet365")
+    assert fake_llm.calls["completion"] == 2
+
+
+@pytest.mark.asyncio
+async def test_generate_outline_cache_key_includes_offer_inputs(fake_llm):
+    await outline_mod.generate_outline("bet365 bonus code", "Title", offer_text="$200 in bonus bets")
+    await outline_mod.generate_outline("bet365 bonus code", "Title", offer_text="$150 in bonus bets")
+    await outline_mod.generate_outline("bet365 bonus code", "Title", offer_text="$150 in bonus bets", num_offers=2)
+
+    assert fake_llm.calls["completion"] == 3
+
+
+@pytest.mark.asyncio
+async def test_streaming_outline_hit_skips_llm(fake_llm):
+    first = [u async for u in outline_mod.generate_outline_streaming("fanduel promo code", "Title")]
+    second = [u async for u in outline_mod.generate_outline_streaming("fanduel promo code", "Title")]
+
+    assert fake_llm.calls["stream"] == 1
+    assert fake_llm.calls["rag"] == 1
+    assert first[-1]["outline"] == second[-1]["outline"]
+    assert [u["type"] for u in second] == ["status", "tokens", "done"]
+
+
+def test_outline_prompts_share_static_system_prefix():
+    titles = {
+        "overview": "Overview",
+        "claim": "How to Claim",
+        "daily_promos": "Daily Promos",
+        "signup": "Sign Up",
+        "terms": "Terms",
+    }
+    common = dict(section_titles=titles, is_prediction_market=False, is_dfs=False)
+
+    sys_a, user_a, tok_a = outline_mod._build_outline_prompt(
+        "bet365 bonus code", "Title A", brand="bet365", offer_text="$200", num_offers=1,
+        rag_context="[a]: snippet", game_context="Chiefs vs Bills", **common,
+    )
+    sys_b, user_b, tok_b = outline_mod._build_outline_prompt(
+        "fanatics promo", "Title B", brand="Fanatics", offer_text="", num_offers=2, **common,
+    )
+    sys_s, user_s, _ = outline_mod._build_outline_prompt(
+        "fanatics promo", "Title B", brand="Fanatics", offer_text="", num_offers=2, streaming=True,
+        rag_context="[a]: snippet", state="NJ", competitor_context="competitor notes", **common,
+    )
+
+    assert sys_a is sys_b
+    assert "bet365" not in sys_a
+    assert "Use 3-4 H2 sections MAX" in sys_a
+    assert "GAME: Chiefs vs Bills" in user_a
+    assert "[a]: snippet" not in user_a
+    assert (tok_a, tok_b) == ("[SHORTCODE]", "[SHORTCODE_MAIN]")
+
+    assert sys_s is not sys_a
+    assert "Use 4-5 H2 sections" in sys_s
+    assert "Include a Daily Promos section placeholder" in sys_s
+    assert "These show how we typically structure similar articles.\n[a]: snippet" in user_s
+    assert "STATE: NJ" in user_s and "COMPETITOR CONTEXT:\ncompetitor notes" in user_s
+
+
+@pytest.mark.asyncio
+async def test_outline_cache_async_lookup_reads_persisted_entries(tmp_path):
+    path = tmp_path / "outlines.sqlite3"
+    await OutlineCache(path).store("k", ["[INTRO]", "[SHORTCODE]"])
+
+    reloaded = OutlineCache(path)
+
+    assert await reloaded.lookup("k") == ["[INTRO]", "[SHORTCODE]"]
+    assert await reloaded.lookup("missing") is None
+    assert await OutlineCache(None).lookup("k") is None
+
+
+def test_outline_cache_persists_across_instances(tmp_path):
+    path = tmp_path / "outlines.sqlite3"
+    OutlineCache(path).set("k", ["[INTRO]", "[SHORTCODE]"])
+
+    reloaded = OutlineCache(path)
+
+    assert reloaded.get("k") == ["[INTRO]", "[SHORTCODE]"]
+    assert reloaded.get("missing") is None
+
+
+def test_outline_cache_expires_entries(tmp_path):
+    cache = OutlineCache(tmp_path / "outlines.sqlite3", ttl_seconds=-1)
+    cache.set("k", ["[INTRO]"])
+
+    assert cache.get("k") is None
+    assert OutlineCache(tmp_path / "outlines.sqlite3").get("k") is None
+
+
+def test_outline_cache_key_includes_sampling_params():
+    base = dict(variant="outline", keyword="bet365 bonus code", temperature=0.3, max_tokens=1000)
+
+    assert outline_cache_key(**base) == outline_cache_key(**dict(base))
+    assert outline_cache_key(**base) != outline_cache_key(**{**base, "temperature": 0.7})
+
+
+@pytest.mark.asyncio
+async def test_outline_cache_key_includes_prompt_version(fake_llm, monkeypatch):
+    await outline_mod.generate_outline("bet365 bonus code", "Title")
+    monkeypatch.setattr(outline_mod, "LEGACY_OUTLINE_PROMPT_VERSION", outline_mod.LEGACY_OUTLINE_PROMPT_VERSION + 1)
+    await outline_mod.generate_outline("bet365 bonus code", "Title")
+
+    assert fake_llm.calls["completion"] == 2
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_reuses_near_duplicate_outlines(fake_llm, monkeypatch, tmp_path):
+    vectors = {
+        "draftkings promo code|DraftKings Promo|DraftKings": [1.0, 0.0, 0.0],
+        "draftkings promo|DraftKings Promo|DraftKings": [0.99, 0.05, 0.0],
+        "fanduel promo code|FanDuel Promo|FanDuel": [0.98, 0.1, 0.0],
+        "draftkings promo today|DraftKings Promo|DraftKings": [0.0, 1.0, 0.0],
+    }
+
+    async def _fake_embedding(text):
+        return vectors[text]
+
+    monkeypatch.setattr(cache_mod, "get_embedding", _fake_embedding)
+    semantic = SemanticOutlineCache(tmp_path / "semcache", threshold=0.92)
+    monkeypatch.setattr(outline_mod, "semantic_outline_cache", semantic)
+
+    first = await outline_mod.generate_outline("draftkings promo code", "DraftKings Promo", brand="DraftKings")
+    near = await outline_mod.generate_outline("draftkings promo", "DraftKings Promo", brand="DraftKings")
+    assert near == first
+    assert fake_llm.calls["completion"] == 1
+
+    # Similar vector but different brand scope, and same brand but dissimilar vector
+    await outline_mod.generate_outline("fanduel promo code", "FanDuel Promo", brand="FanDuel")
+    await outline_mod.generate_outline("draftkings promo today", "DraftKings Promo", brand="DraftKings")
+    assert fake_llm.calls["completion"] == 3
+
+    # Same text but a different game is a different outline
+    await outline_mod.generate_outline(
+        "draftkings promo", "DraftKings Promo", brand="DraftKings", game_context="Chiefs vs Bills"
+    )
+    assert fake_llm.calls["completion"] == 4
+
+    reloaded = SemanticOutlineCache(tmp_path / "semcache", threshold=0.92)
+    vec = await reloaded.embed("draftkings promo|DraftKings Promo|DraftKings")
+    scope = outline_mod._semantic_outline_scope("outline", "DraftKings", "", 1, "sportsbook", game_context="")
+    assert await reloaded.search(vec, scope) == first
+    streaming_scope = outline_mod._semantic_outline_scope(
+        "outline_streaming", "DraftKings", "", 1, "sportsbook", state="ALL", competitor_context="", style_profile=""
+    )
+    assert await reloaded.search(vec, streaming_scope) is None
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_expires_and_evicts_entries(tmp_path):
+    scope = {"variant": "outline"}
+    vec_a = np.array([[1.0, 0.0]], dtype=np.float32)
+    vec_b = np.array([[0.0, 1.0]], dtype=np.float32)
+
+    expired = SemanticOutlineCache(tmp_path / "expired", ttl_seconds=-1)
+    await expired.add(vec_a, scope, ["[INTRO]"])
+    assert await expired.search(vec_a, scope) is None
+
+    full = SemanticOutlineCache(tmp_path / "full", max_entries=1)
+    await full.add(vec_a, scope, ["[H2: A]"])
+    await full.add(vec_b, scope, ["[H2: B]"])
+    assert await full.search(vec_a, scope) is None
+    assert await full.search(vec_b, scope) == ["[H2: B]"]
+
+    reloaded = SemanticOutlineCache(tmp_path / "full", max_entries=1)
+    assert await reloaded.search(vec_b, scope) == ["[H2: B]"]
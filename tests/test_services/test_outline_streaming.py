@@ -0,0 +1,84 @@
+"""Tests for the legacy token outline streaming path."""
+
+import pytest
+
+import app.services.outline as outline_mod
+
+
+async def _collect(**kwargs):
+    return [update async for update in outline_mod.generate_outline_streaming(**kwargs)]
+
+
+@pytest.mark.asyncio
+async def test_streaming_batches_tokens_into_frames(fake_llm):
+    chunks = [
+        "[INTRO]\n[SHORT",
+        "CODE]\nsome chatter\n[H2: Overview]\n",
+        "[H2: How to Claim]\n[H2: Sign Up]\n",
+        "[H2: Terms]",
+    ]
+    fake_llm.chunks = chunks
+
+    updates = await _collect(keyword="bet365 bonus code", title="bet365 bonus code")
+
+    frames = [u for u in updates if u["type"] == "tokens"]
+    assert frames
+    streamed = [tok for f in frames for tok in f["content"]]
+    assert streamed == [
+        "[INTRO]",
+        "[SHORTCODE]",
+        "[H2: Overview]",
+        "[H2: How to Claim]",
+        "[H2: Sign Up]",
+        "[H2: Terms]",
+    ]
+    assert len(frames) < len(streamed)
+    assert updates[-1] == {"type": "done", "outline": streamed}
+
+
+@pytest.mark.asyncio
+async def test_streaming_falls_back_to_default_tokens(fake_llm):
+    fake_llm.chunks = ["no tokens here\n", "still nothing"]
+
+    updates = await _collect(keyword="Offer", title="Offer", num_offers=1)
+
+    assert not [u for u in updates if u["type"] == "tokens"]
+    assert updates[-1]["outline"] == outline_mod._default_tokens_multi(num_offers=1, keyword="Offer")
+
+
+def test_streamed_token_gate_is_case_insensitive_and_exact():
+    assert outline_mod._is_token_line("[h2: Overview]")
+    assert outline_mod._is_token_line("[Shortcode_1]")
+    assert not outline_mod._is_token_line("[H2:]")
+    assert not outline_mod._is_token_line("[INTRODUCTION]")
+    assert not outline_mod._is_token_line("Here is your outline:")
+
+
+@pytest.mark.asyncio
+async def test_streaming_scan_matches_line_filter(fake_llm):
+    lines = [
+        "  [INTRO]  ",
+        "[h2: Odds [Boosted] Today]\r",
+        "[H2:]",
+        "Intro text [H2: Inline] more",
+        "[Shortcode]",
+        "[H3:",
+        "Details]",
+        "\t[H3: Details]",
+    ]
+    fake_llm.chunks = ["\n".join(lines) + "\n"]
+
+    updates = await _collect(keyword="Offer", title="Offer")
+
+    expected = [line.strip() for line in lines if outline_mod._is_token_line(line.strip())]
+    assert updates[-1]["outline"] == expected
+
+
+@pytest.mark.asyncio
+async def test_streaming_handles_tokens_split_across_many_chunks(fake_llm):
+    text = "chatter [H2: x]\n[INTRO]\n[SHORTCODE]\n[H2: Long Heading Split Up]\n[H2: Tail]"
+    fake_llm.chunks = list(text)
+
+    updates = await _collect(keyword="Offer", title="Offer")
+
+    assert updates[-1]["outline"] == ["[INTRO]", "[SHORTCODE]", "[H2: Long Heading Split Up]", "[H2: Tail]"]
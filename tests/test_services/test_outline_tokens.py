@@ -0,0 +1,105 @@
+"""Tests for legacy outline token parsing."""
+
+from datetime import datetime
+
+from app.services.outline import (
+    DEFAULT_TOKENS,
+    _default_tokens_multi,
+    outline_to_text,
+    parse_outline_tokens,
+    text_to_outline,
+    today_long,
+    validate_outline,
+)
+
+
+def test_parse_accepts_bracketed_and_bare_tokens():
+    text = "intro\n\nshortcode\nH2: Overview\n[h3: Details]\nnot a token\n"
+
+    assert parse_outline_tokens(text) == [
+        "[INTRO]",
+        "[SHORTCODE]",
+        "[H2: Overview]",
+        "[h3: Details]",
+    ]
+
+
+def test_parse_inserts_missing_intro_and_shortcode():
+    tokens = parse_outline_tokens("[H2: Overview]\n[H2: Terms]", default_shortcode_token="[SHORTCODE_1]")
+
+    assert tokens == ["[INTRO]", "[SHORTCODE_1]", "[H2: Overview]", "[H2: Terms]"]
+
+
+def test_parse_moves_alt_shortcodes_after_primary():
+    text = "[INTRO]\n[SHORTCODE]\n[H2: Overview]\n[shortcode_2]\n[H2: Terms]\n[SHORTCODE_1]"
+
+    assert parse_outline_tokens(text) == [
+        "[INTRO]",
+        "[SHORTCODE]",
+        "[shortcode_2]",
+        "[SHORTCODE_1]",
+        "[H2: Overview]",
+        "[H2: Terms]",
+    ]
+
+
+def test_parse_without_tokens_returns_defaults():
+    assert parse_outline_tokens("nothing useful") == DEFAULT_TOKENS
+
+
+def test_text_to_outline_round_trips_sections():
+    outline = [
+        {"level": "intro", "title": "", "talking_points": ["Hook"], "avoid": []},
+        {"level": "shortcode_1", "title": "", "talking_points": [], "avoid": []},
+        {"level": "h2", "title": "Overview", "talking_points": ["A", "B"], "avoid": ["terms", "odds"]},
+        {"level": "h3", "title": "Details", "talking_points": [], "avoid": []},
+    ]
+
+    assert text_to_outline(outline_to_text(outline)) == outline
+
+
+def test_today_long_formats_and_tolerates_unknown_timezone():
+    now = datetime.now()
+    label = today_long("Not/AZone")
+
+    assert label.endswith(f"{now.year}")
+    assert today_long("Not/AZone") is label
+
+
+def test_validate_outline_reports_warnings_in_order():
+    outline = [
+        {"level": "shortcode", "title": "", "talking_points": [], "avoid": []},
+        {"level": "h2", "title": "Overview", "talking_points": ["a"], "avoid": []},
+        {"level": "h3", "title": "Details", "talking_points": ["a", "b"], "avoid": []},
+        {"level": "h2", "title": "bet365 bonus code steps", "talking_points": ["a", "b"], "avoid": []},
+    ]
+
+    assert validate_outline(outline, "bet365 Bonus Code") == [
+        "Missing [INTRO] section",
+        "Only 2 H2 sections (recommend 4-5)",
+        "Consider adding more [SHORTCODE] placements for CTAs",
+        "First H2 should contain keyword 'bet365 Bonus Code'",
+        "Keyword 'bet365 Bonus Code' only in 1 H2 titles (recommend 3+)",
+        "Section 'Overview' has too few talking points",
+    ]
+
+
+def test_parse_bare_shortcode_suffixes():
+    text = "Shortcode_main\nSHORTCODE_\nshortcode_a-b\nintro"
+
+    assert parse_outline_tokens(text) == ["[SHORTCODE_MAIN]", "[INTRO]"]
+
+
+def test_default_tokens_multi_returns_fresh_lists():
+    first = _default_tokens_multi(num_offers=3, keyword="bet365")
+    first.append("[H2: Extra]")
+
+    assert _default_tokens_multi(num_offers=4, keyword="bet365") == first[:-1]
+    assert "[SHORTCODE_2]" in first
+    assert "[SHORTCODE_1]" not in _default_tokens_multi(num_offers=1, keyword="bet365")
+
+
+def test_parse_length_and_first_char_gate():
+    text = "H2:x\n- [H2: Bullet]\n  [INTRO]  \nabc\n[SHORTCODE]"
+
+    assert parse_outline_tokens(text) == ["[H2:x]", "[INTRO]", "[SHORTCODE]"]
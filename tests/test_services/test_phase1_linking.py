@@ -7,7 +7,7 @@ from app.services.draft import (
     _offer_switchboard_url,
     _render_html_offer_block,
 )
-from app.services.switchboard_links import inject_switchboard_links
+from app.services.switchboard_links import inject_switchboard_links, make_switchboard_injector
 
 
 def test_switchboard_injection_skips_generic_promo_code_anchor_for_wrong_offer():
@@ -141,3 +141,66 @@ def test_render_offer_block_rebuilds_shortcode_for_active_property():
     assert 'property-id="326"' in block
     assert 'affiliate-type="social-sportsbook"' in block
     assert 'property-id="1"' not in block
+
+
+def test_switchboard_fallback_skips_headings_and_existing_anchors():
+    html = (
+        "<H2>bet365 picks</H2><p><a href='/x'>bet365 review</a> and "
+        "<strong>bet365 bonus code</strong></p><p>Join bet365 today.</p>"
+    )
+    out = inject_switchboard_links(
+        html,
+        brand="bet365",
+        bonus_code="",
+        switchboard_url="https://switchboard.example.com/offers?affiliateId=1",
+    )
+    assert out == html
+
+    body_first = "<p>Join bet365 today.</p><h2>bet365 picks</h2>"
+    out = inject_switchboard_links(
+        body_first,
+        brand="bet365",
+        bonus_code="",
+        switchboard_url="https://switchboard.example.com/offers?affiliateId=1",
+    )
+    assert out.count("switchboard_tracking") == 1
+    assert out.startswith('<p>Join <a data-id="switchboard_tracking"')
+
+
+def test_switchboard_fallback_uses_parsed_tag_context():
+    html = (
+        '<A HREF="/x" title="a > b">Sportsbook review</A>'
+        "<!-- <a href='/old'> -->"
+        "<aside>Join bet365 today.</aside>"
+    )
+    out = inject_switchboard_links(
+        html,
+        brand="bet365",
+        bonus_code="",
+        switchboard_url="https://switchboard.example.com/offers?affiliateId=1",
+    )
+    assert out.count("switchboard_tracking") == 1
+    assert out.endswith('<aside>Join <a data-id="switchboard_tracking" '
+                        'href="https://switchboard.example.com/offers?affiliateId=1" '
+                        'rel="nofollow">bet365</a> today.</aside>')
+
+
+def test_switchboard_injection_links_code_anchor_without_brand_mention():
+    url = "https://switchboard.example.com/offers?affiliateId=1"
+
+    code_only = "<p>Use <strong>ACTION365</strong> at signup.</p>"
+    out = inject_switchboard_links(code_only, brand="bet365", bonus_code="action365", switchboard_url=url)
+    assert out.count("switchboard_tracking") == 1
+
+    unrelated = "<p>Use <strong>FanDuel</strong> at signup.</p>"
+    assert inject_switchboard_links(unrelated, brand="bet365", bonus_code="ACTION365", switchboard_url=url) is unrelated
+
+
+def test_switchboard_injector_is_reused_per_offer():
+    url = "https://switchboard.example.com/offers?affiliateId=1"
+    injector = make_switchboard_injector("bet365", "SAVE50", url)
+
+    assert make_switchboard_injector("bet365", "SAVE50", url) is injector
+    html = "<p>Use <strong>SAVE50</strong> with bet365.</p>"
+    assert injector(html) == inject_switchboard_links(html, "bet365", "SAVE50", url)
+    assert injector(html).count("switchboard_tracking") == 1
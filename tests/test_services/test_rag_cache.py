@@ -0,0 +1,138 @@
+"""Tests for RAG query caching."""
+
+import asyncio
+
+import pytest
+
+import app.services.rag as rag_mod
+
+
+class _FakeStore:
+    def __init__(self):
+        self.calls = 0
+
+    async def query_articles(self, query, k=5, snippet_chars=500):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return [{"score": 0.9, "path": "a.md", "snippet": f"{query}:{k}:{snippet_chars}", "source": "a.md"}]
+
+
+@pytest.fixture
+def fake_store(monkeypatch):
+    store = _FakeStore()
+    monkeypatch.setattr(rag_mod, "get_rag_store", lambda: store)
+    rag_mod._QUERY_CACHE.clear()
+    yield store
+    rag_mod._QUERY_CACHE.clear()
+
+
+@pytest.mark.asyncio
+async def test_query_articles_caches_by_normalized_query(fake_store):
+    first = await rag_mod.query_articles("bet365  bonus code", k=6, snippet_chars=800)
+    second = await rag_mod.query_articles(" BET365 bonus code ", k=6, snippet_chars=800)
+
+    assert fake_store.calls == 1
+    assert first == second
+
+    await rag_mod.query_articles("bet365 bonus code", k=5, snippet_chars=600)
+    assert fake_store.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_query_articles_returns_copies(fake_store):
+    first = await rag_mod.query_articles("fanduel promo code")
+    first[0]["snippet"] = "mutated"
+    first.clear()
+
+    second = await rag_mod.query_articles("fanduel promo code")
+    assert second[0]["snippet"] != "mutated"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_share_one_search(fake_store):
+    results = await asyncio.gather(*[rag_mod.query_articles("draftkings promo code") for _ in range(5)])
+
+    assert fake_store.calls == 1
+    assert all(r == results[0] for r in results)
+    assert not rag_mod._QUERY_INFLIGHT
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_share_one_failed_search(monkeypatch):
+    calls = []
+
+    async def _failing_query(query, k=5, snippet_chars=500):
+        calls.append(query)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("index unavailable")
+
+    store = _FakeStore()
+    store.query_articles = _failing_query
+    monkeypatch.setattr(rag_mod, "get_rag_store", lambda: store)
+    rag_mod._QUERY_CACHE.clear()
+
+    results = await asyncio.gather(
+        *[rag_mod.query_articles("caesars promo code") for _ in range(5)],
+        return_exceptions=True,
+    )
+
+    assert len(calls) == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert not rag_mod._QUERY_INFLIGHT
+
+
+@pytest.mark.asyncio
+async def test_batching_embedder_coalesces_concurrent_queries(monkeypatch):
+    calls = []
+
+    async def _fake_batch(texts):
+        calls.append(list(texts))
+        return [[float(len(t))] for t in texts]
+
+    monkeypatch.setattr(rag_mod, "get_embeddings_batch", _fake_batch)
+    embedder = rag_mod.BatchingEmbedder(window_seconds=0.01)
+
+    queries = ["a", "bb", "a", "cccc", "ddd"]
+    vectors = await asyncio.gather(*[embedder.embed(q) for q in queries])
+
+    assert calls == [["a", "bb", "cccc", "ddd"]]
+    assert vectors == [[1.0], [2.0], [1.0], [4.0], [3.0]]
+
+
+@pytest.mark.asyncio
+async def test_batching_embedder_propagates_errors(monkeypatch):
+    async def _failing_batch(texts):
+        raise RuntimeError("embeddings down")
+
+    monkeypatch.setattr(rag_mod, "get_embeddings_batch", _failing_batch)
+    embedder = rag_mod.BatchingEmbedder(window_seconds=0.001, max_batch=2)
+
+    results = await asyncio.gather(
+        embedder.embed("a"), embedder.embed("b"), embedder.embed("c"), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_embed_query_caches_normalized_vectors(monkeypatch):
+    calls = []
+
+    async def _fake_batch(texts):
+        calls.append(list(texts))
+        return [[3.0, 4.0] for _ in texts]
+
+    monkeypatch.setattr(rag_mod, "get_embeddings_batch", _fake_batch)
+    monkeypatch.setattr(rag_mod, "_EMB_CACHE", rag_mod.OrderedDict())
+    monkeypatch.setattr(rag_mod, "EMBEDDING_CACHE_MAX_KEYS", 2)
+
+    first = await rag_mod._embed_query("FanDuel promo ")
+    second = await rag_mod._embed_query("fanduel promo")
+
+    assert len(calls) == 1
+    assert second is first
+    assert first.tolist() == [[pytest.approx(0.6), pytest.approx(0.8)]]
+
+    await rag_mod._embed_query("b")
+    await rag_mod._embed_query("c")
+    assert list(rag_mod._EMB_CACHE) == ["b", "c"]
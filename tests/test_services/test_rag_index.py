@@ -0,0 +1,185 @@
+"""Tests for FAISS index construction."""
+
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import app.services.rag_builder as builder_mod
+
+
+def _vectors(n: int, dim: int = 16) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    arr = rng.standard_normal((n, dim)).astype(np.float32)
+    return arr / np.linalg.norm(arr, axis=1, keepdims=True)
+
+
+def test_small_corpus_uses_quantized_exact_index():
+    vectors = _vectors(50)
+
+    index = builder_mod._make_faiss_index(vectors)
+    scores, ids = index.search(vectors[3:4], 1)
+
+    assert type(index).__name__ == "IndexScalarQuantizer"
+    assert index.ntotal == 50
+    assert index.code_size == vectors.shape[1]
+    assert ids[0][0] == 3
+    assert scores[0][0] > 0.99
+
+
+def test_large_corpus_uses_hnsw_and_finds_exact_match(monkeypatch):
+    monkeypatch.setattr(builder_mod, "HNSW_MIN_VECTORS", 100)
+    vectors = _vectors(500)
+
+    index = builder_mod._make_faiss_index(vectors)
+    scores, ids = index.search(vectors[7:8], 1)
+
+    assert type(index).__name__ == "IndexHNSWSQ"
+    assert ids[0][0] == 7
+    assert scores[0][0] > 0.99
+
+
+def test_legacy_index_loads_in_slices_and_persists(tmp_path, monkeypatch):
+    import json
+
+    import app.services.rag as rag_mod
+
+    vectors = _vectors(25)
+    (tmp_path / "legacy.bin").write_bytes(vectors.tobytes())
+    (tmp_path / "legacy.shape.json").write_text(json.dumps({"dim": vectors.shape[1]}))
+    (tmp_path / "legacy.jsonl").write_text(
+        "".join(json.dumps({"path": f"{i}.md", "preview": str(i)}) + "\n" for i in range(25))
+    )
+    monkeypatch.setattr(rag_mod, "LEGACY_INDEX_BIN", tmp_path / "legacy.bin")
+    monkeypatch.setattr(rag_mod, "LEGACY_INDEX_SHAPE", tmp_path / "legacy.shape.json")
+    monkeypatch.setattr(rag_mod, "LEGACY_INDEX_META", tmp_path / "legacy.jsonl")
+    monkeypatch.setattr(rag_mod, "FAISS_DIR", tmp_path / "faiss")
+    monkeypatch.setattr(rag_mod, "FAISS_INDEX_FILE", tmp_path / "faiss" / "index.faiss")
+    monkeypatch.setattr(rag_mod, "FAISS_META_FILE", tmp_path / "faiss" / "metadata.jsonl")
+    monkeypatch.setattr(rag_mod, "LEGACY_ADD_BATCH_SIZE", 10)
+
+    store = rag_mod.RAGStore()
+    assert store._ensure_loaded()
+    assert store._index.ntotal == 25
+
+    reloaded = rag_mod.RAGStore()
+    assert reloaded._load_faiss()
+    assert reloaded._index.ntotal == 25
+    assert len(reloaded._metadata) == 25
+
+
+def test_chunk_text_overlaps_and_drops_short_tail():
+    text = "x" * 2150
+
+    chunks = builder_mod._chunk_text(text, chunk_size=1000, overlap=100)
+
+    assert [start for start, _ in chunks] == [0, 900, 1800]
+    assert [len(chunk) for _, chunk in chunks] == [1000, 1000, 350]
+    assert builder_mod._chunk_text("short " * 10) == []
+
+
+@pytest.mark.asyncio
+async def test_build_rag_index_keeps_file_order(tmp_path, monkeypatch):
+    import json
+
+    src = tmp_path / "articles"
+    src.mkdir()
+    for name in ("b.md", "a.md", "c.md"):
+        (src / name).write_text(f"---\ntitle: {name}\n---\n" + f"{name} body " * 40)
+
+    async def _fake_batch(texts):
+        return [[1.0, float(i)] for i, _ in enumerate(texts)]
+
+    settings = SimpleNamespace(data_dir=tmp_path, storage_dir=tmp_path / "storage", base_dir=tmp_path)
+    monkeypatch.setattr(builder_mod, "get_embeddings_batch", _fake_batch)
+    monkeypatch.setattr(builder_mod, "get_settings", lambda: settings)
+
+    count = await builder_mod.build_rag_index(src)
+
+    meta = [json.loads(line) for line in (tmp_path / "storage" / "faiss_index" / "metadata.jsonl").open()]
+    assert count == 3
+    assert [m["path"] for m in meta] == ["articles/a.md", "articles/b.md", "articles/c.md"]
+    assert not meta[0]["preview"].startswith("---")
+
+
+@pytest.mark.asyncio
+async def test_build_rag_index_reads_within_bounded_window(tmp_path, monkeypatch):
+    from pathlib import Path
+
+    src = tmp_path / "articles"
+    src.mkdir()
+    for i in range(10):
+        (src / f"{i:02d}.md").write_text(f"article {i} " * 40)
+
+    reads = []
+    read_text = Path.read_text
+
+    def _counting_read_text(self, *args, **kwargs):
+        reads.append(self.name)
+        return read_text(self, *args, **kwargs)
+
+    read_ahead = []
+
+    async def _fake_batch(texts):
+        await asyncio.sleep(0.01)  # slow consumer: reads would race ahead
+        read_ahead.append(len(reads) - len(read_ahead) - 1)
+        if len(read_ahead) == 4:
+            raise RuntimeError("embeddings unavailable")
+        return [[1.0, 0.0] for _ in texts]
+
+    settings = SimpleNamespace(data_dir=tmp_path, storage_dir=tmp_path / "storage", base_dir=tmp_path)
+    monkeypatch.setattr(Path, "read_text", _counting_read_text)
+    monkeypatch.setattr(builder_mod, "READ_CONCURRENCY", 2)
+    monkeypatch.setattr(builder_mod, "get_embeddings_batch", _fake_batch)
+    monkeypatch.setattr(builder_mod, "get_settings", lambda: settings)
+
+    with pytest.raises(RuntimeError):
+        await builder_mod.build_rag_index(src, batch_size=1)
+
+    assert max(read_ahead) <= 2
+    assert len(reads) <= 6
+
+
+@pytest.mark.asyncio
+async def test_store_search_runs_index_scan(monkeypatch):
+    import app.services.rag as rag_mod
+
+    vectors = _vectors(20)
+
+    async def _fake_batch(texts):
+        return [vectors[4].tolist() for _ in texts]
+
+    monkeypatch.setattr(rag_mod, "get_embeddings_batch", _fake_batch)
+    monkeypatch.setattr(rag_mod, "_EMB_CACHE", rag_mod.OrderedDict())
+    store = rag_mod.RAGStore()
+    store._index = builder_mod._make_faiss_index(vectors)
+    store._metadata = [{"path": f"{i}.md", "preview": str(i)} for i in range(20)]
+    store._loaded = True
+
+    hits = await store.search("anything", top_k=3)
+
+    assert hits[0]["path"] == "4.md"
+    assert len(hits) == 3
+
+
+@pytest.mark.asyncio
+async def test_store_query_articles_extends_previews_from_disk(tmp_path, monkeypatch):
+    import app.services.rag as rag_mod
+
+    article = tmp_path / "a.md"
+    article.write_text("---\ntitle: A\n---\n" + "long   body " * 100)
+
+    async def _fake_search(query, top_k=8, min_score=0.0):
+        return [
+            {"score": 0.9, "path": str(article), "preview": "long body", "source": "a.md"},
+            {"score": 0.8, "path": str(tmp_path / "missing.md"), "preview": "kept", "source": "missing.md"},
+        ]
+
+    store = rag_mod.RAGStore()
+    monkeypatch.setattr(store, "search", _fake_search)
+
+    results = await store.query_articles("q", k=2, snippet_chars=40)
+
+    assert results[0]["snippet"] == ("long body " * 4)[:40]
+    assert results[1]["snippet"] == "kept"
@@ -0,0 +1,131 @@
+"""Tests for streaming structured outline generation."""
+
+import json
+
+import pytest
+
+import app.services.outline as outline_mod
+
+OUTLINE = {
+    "outline": [
+        {"level": "intro", "title": "", "talking_points": ["Lead with the {offer}"], "avoid": []},
+        {"level": "shortcode", "title": "", "talking_points": [], "avoid": []},
+        {"level": "h2", "title": "Why \"Odds [Boosts]\" Matter", "talking_points": ["A", "B"], "avoid": ["terms"]},
+        {"level": "h2", "title": "How to Claim", "talking_points": ["Steps"], "avoid": []},
+    ]
+}
+
+
+def _chunks(text: str, size: int) -> list[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 7, 10_000])
+def test_section_parser_emits_each_closed_section(size):
+    parser = outline_mod._OutlineSectionParser()
+
+    emitted = []
+    for chunk in _chunks(json.dumps(OUTLINE), size):
+        emitted.extend(parser.feed(chunk))
+
+    assert emitted == OUTLINE["outline"]
+
+
+def test_section_parser_skips_invalid_levels_and_bare_arrays():
+    parser = outline_mod._OutlineSectionParser()
+
+    emitted = parser.feed('[{"level": "footer"}, {"level": "h3", "title": "Ok"}]')
+
+    assert emitted == [{"level": "h3", "title": "Ok"}]
+
+
+@pytest.mark.asyncio
+async def test_streaming_outline_yields_sections_before_done(fake_llm):
+    fake_llm.chunks = _chunks(json.dumps(OUTLINE), 16)
+
+    updates = [
+        update
+        async for update in outline_mod.generate_structured_outline_streaming(
+            keyword="bet365 bonus code",
+            title="bet365 bonus code",
+            offer={"brand": "bet365", "offer_text": "Bet $10, Get $200"},
+        )
+    ]
+
+    assert [u["type"] for u in updates] == ["section"] * 4 + ["done"]
+    assert [u["data"] for u in updates[:-1]] == OUTLINE["outline"]
+    assert updates[-1]["outline"][0]["level"] == "intro"
+    assert fake_llm.stream_kwargs["response_format"] is outline_mod.OUTLINE_RESPONSE_FORMAT
+
+
+@pytest.mark.asyncio
+async def test_streaming_outline_falls_back_on_error(fake_llm):
+    fake_llm.chunks = []
+    fake_llm.error = RuntimeError("stream dropped")
+
+    updates = [
+        update
+        async for update in outline_mod.generate_structured_outline_streaming(
+            keyword="bet365 bonus code",
+            title="bet365 bonus code",
+            offer={"brand": "bet365"},
+            variation_key="fixed",
+        )
+    ]
+
+    assert [u["type"] for u in updates] == ["done"]
+    assert len(updates[-1]["outline"]) > 3
+
+
+@pytest.mark.asyncio
+async def test_streaming_outline_finalizes_sections_received_before_error(fake_llm):
+    fake_llm.chunks = [json.dumps(OUTLINE)[:-3]]
+    fake_llm.error = RuntimeError("stream dropped")
+    kwargs = dict(keyword="bet365 bonus code", title="bet365 bonus code", offer={"brand": "bet365"}, variation_key="fixed")
+
+    updates = [update async for update in outline_mod.generate_structured_outline_streaming(**kwargs)]
+
+    received = [u["data"] for u in updates if u["type"] == "section"]
+    plan = await outline_mod._prepare_structured_outline(**kwargs)
+    assert received == OUTLINE["outline"][:3]
+    assert updates[-1]["outline"] == outline_mod._finalize_structured_outline(received, plan)
+
+
+@pytest.mark.asyncio
+async def test_structured_prompt_keeps_static_prefix(fake_llm):
+    fake_llm.articles = [{"snippet": "style snippet"}]
+
+    plan_a = await outline_mod._prepare_structured_outline(
+        keyword="bet365 bonus code",
+        title="bet365 bonus code",
+        offer={"brand": "bet365", "offer_text": "Bet $10, Get $200"},
+    )
+    plan_b = await outline_mod._prepare_structured_outline(
+        keyword="fanatics promo",
+        title="Fanatics promo for NFL Sunday",
+        offer={"brand": "Fanatics"},
+        article_preferences={"allow_h3": False},
+    )
+
+    assert plan_a["system_prompt"] is plan_b["system_prompt"]
+    assert "STYLE GUIDE" in plan_a["system_prompt"]
+    assert "bet365" not in plan_a["system_prompt"]
+    assert plan_a["user_prompt"].startswith("STYLE EXAMPLES (match this tone):\nstyle snippet\n")
+    assert "Do not use H3 subsections" in plan_b["user_prompt"]
+
+
+@pytest.mark.asyncio
+async def test_structured_prompt_shares_legacy_rag_query(fake_llm):
+    fake_llm.articles = [
+        {"snippet": f"{i}" * outline_mod.OUTLINE_RAG_SNIPPET_CHARS} for i in range(outline_mod.OUTLINE_RAG_K)
+    ]
+
+    plan = await outline_mod._prepare_structured_outline(
+        keyword="bet365 bonus code",
+        title="bet365 bonus code",
+        offer={"brand": "bet365"},
+    )
+
+    assert fake_llm.rag_queries == [("bet365 bonus code", outline_mod.OUTLINE_RAG_K, outline_mod.OUTLINE_RAG_SNIPPET_CHARS)]
+    assert "0" * 600 + "\n\n1" in plan["user_prompt"]
+    assert "0" * 601 not in plan["user_prompt"]